@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+""" latency of repeated attribute chains like `cfg.database.connection.hosts`
+
+run from the repository root: `python benchmarks/attribute_access.py`
+"""
+import os, sys, timeit
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import lazyConfig
+from lazyConfig import LazyMode
+
+NUMBER = 20000
+
+def chain(cfg):
+    return cfg.database.connection.hosts[0].host
+
+def main():
+    for mode in (LazyMode.CACHED, LazyMode.LAZY):
+        cfg = lazyConfig.from_path(
+            'tests/config_default', ['tests/config'], laziness=mode)
+        chain(cfg) # first access loads the files
+        seconds = timeit.timeit(lambda: chain(cfg), number=NUMBER)
+        print(f"{mode.name:>7}: {seconds/NUMBER*1e6:8.2f} us per attribute chain")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+""" synthetic configuration trees for the benchmarks
+
+    python benchmarks/generate.py /tmp/tree --depth 3 --width 4 --layers 2
+
+creates /tmp/tree/default and the override layers /tmp/tree/override<i>
+"""
+import os, sys, json, argparse
+from typing import List, NamedTuple, Tuple
+
+import yaml
+
+
+class TreeSpec(NamedTuple):
+    """ shape of a synthetic tree
+
+    depth: levels of directories below the root
+    width: subdirectories per directory
+    files: files per directory (alternating .yml and .json)
+    keys: keys per file, every fourth one is a nested mapping
+    value_size: length of the string values
+    list_length: elements of the list directory `items` in every leaf directory
+    layers: number of override layers, they override every other file
+    """
+    depth: int = 3
+    width: int = 4
+    files: int = 3
+    keys: int = 20
+    value_size: int = 16
+    list_length: int = 10
+    layers: int = 2
+
+    def deepest_path(self) -> List[str]:
+        """ keys of a leaf overridden by every layer """
+        return ['dir0'] * self.depth + ['file0', 'key1']
+
+    def directories(self) -> int:
+        return sum(self.width ** level for level in range(self.depth + 1))
+
+
+def _file_contents(spec: TreeSpec, layer: int) -> dict:
+    contents = {}
+    for idx in range(spec.keys):
+        if layer and idx % 2 == 0: # overrides only contain some keys
+            continue
+        value = f"{layer}-{idx}-".ljust(spec.value_size, 'x')
+        if idx % 4 == 3:
+            value = {'nested': value, 'number': idx, 'flag': idx % 3 == 0}
+        contents[f'key{idx}'] = value
+    return contents
+
+def _write(path: str, contents):
+    with open(path, 'w') as f:
+        if path.endswith('.json'):
+            json.dump(contents, f)
+        else:
+            yaml.safe_dump(contents, f)
+
+def _generate_dir(path: str, spec: TreeSpec, level: int, layer: int):
+    os.makedirs(path, exist_ok=True)
+    for idx in range(spec.files):
+        if layer and idx % 2 == 1:
+            continue
+        extension = '.yml' if idx % 2 == 0 else '.json'
+        _write(os.path.join(path, f'file{idx}{extension}'), _file_contents(spec, layer))
+    if level == spec.depth:
+        if not layer and spec.list_length:
+            items = os.path.join(path, 'items')
+            os.makedirs(items, exist_ok=True)
+            for idx in range(spec.list_length):
+                _write(os.path.join(items, f'{idx}.yml'), _file_contents(spec, 0))
+        return
+    for idx in range(spec.width):
+        _generate_dir(os.path.join(path, f'dir{idx}'), spec, level + 1, layer)
+
+def generate_tree(root: str, spec: TreeSpec = TreeSpec()) -> Tuple[str, List[str]]:
+    """ write the default configuration and the override layers below root
+
+    Returns:
+        Tuple[str, List[str]]: path of the default configuration, paths of the overrides
+    """
+    default = os.path.join(root, 'default')
+    _generate_dir(default, spec, 0, 0)
+    overrides = []
+    for layer in range(1, spec.layers + 1):
+        overrides.append(path := os.path.join(root, f'override{layer}'))
+        _generate_dir(path, spec, 0, layer)
+    return default, overrides
+
+def add_spec_arguments(parser: argparse.ArgumentParser):
+    for field, default in TreeSpec._field_defaults.items():
+        parser.add_argument('--' + field.replace('_', '-'), type=int, default=default)
+
+def spec_from_args(args: argparse.Namespace) -> TreeSpec:
+    return TreeSpec(**{field: getattr(args, field) for field in TreeSpec._fields})
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('root')
+    add_spec_arguments(parser)
+    args = parser.parse_args(argv)
+    spec = spec_from_args(args)
+    generate_tree(args.root, spec)
+    print(f"generated {spec.directories()} directories per layer in {args.root}")
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+""" memory per node of a loaded tree of directories
+
+run from the repository root: `python benchmarks/node_memory.py`
+"""
+import os, sys, tempfile, tracemalloc
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import lazyConfig
+
+DIRECTORIES = 2000 # every directory contains 2 files and a list with 2 elements
+
+def make_tree(root: str):
+    for idx in range(DIRECTORIES):
+        directory = os.path.join(root, f'node{idx}')
+        os.makedirs(os.path.join(directory, 'items'))
+        for name in ('alpha', 'beta'):
+            with open(os.path.join(directory, name + '.yml'), 'w') as f:
+                f.write('a: 1\n')
+        for element in range(2):
+            with open(os.path.join(directory, 'items', f'{element}.yml'), 'w') as f:
+                f.write('- 1\n')
+
+def touch_all(cfg):
+    """ walk the Config keeping every node alive through the memoization """
+    for key in cfg:
+        value = cfg[key]
+        if isinstance(value, lazyConfig.Config):
+            touch_all(value)
+
+def measure(build) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+def main():
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root)
+        lazy_dict = lazyConfig.LazyDict(root)
+        lazy_dict.force_load() # warm up the file system cache and imports
+
+        size, lazy_dict = measure(lambda: lazyConfig.LazyDict(root))
+        print(f"LazyDict (unloaded):   {size/DIRECTORIES:8.0f} bytes per directory")
+        size, _ = measure(lazy_dict.force_load)
+        print(f"force_load:            {size/DIRECTORIES:8.0f} bytes per directory")
+        cfg = lazyConfig.Config(lazy_dict, [])
+        size, _ = measure(lambda: touch_all(cfg))
+        print(f"Config nodes:          {size/DIRECTORIES:8.0f} bytes per directory")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+""" benchmark suite on a synthetic tree (see generate.py) for every LazyMode
+
+run from the repository root:
+
+    python benchmarks/suite.py --save baseline.json      # e.g. on the main branch
+    python benchmarks/suite.py --compare baseline.json   # on your branch
+
+with --compare the exit code is 1 if a metric got worse by more than --tolerance.
+"""
+import os, sys, json, time, timeit, argparse, statistics, tempfile, tracemalloc
+from functools import reduce
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import lazyConfig
+from lazyConfig import LazyMode
+
+from generate import TreeSpec, generate_tree, add_spec_arguments, spec_from_args
+
+REPEAT_ACCESS_NUMBER = 2000
+
+# metric -> unit, all metrics are "lower is better"
+UNITS = {
+    'startup': 'ms',
+    'first_access': 'ms',
+    'repeat_access': 'us',
+    'override_resolution': 'us',
+    'as_dict': 'ms',
+    'peak_memory': 'KiB',
+}
+
+
+def access(cfg, path):
+    return reduce(getattr, path, cfg)
+
+def _median_time(setup, run, repeat: int) -> float:
+    """ median seconds of run(setup()) over `repeat` fresh setups """
+    times = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+def measure(default: str, overrides: list, spec: TreeSpec, mode: LazyMode, repeat: int) -> dict:
+    path = spec.deepest_path()
+    build = lambda: lazyConfig.from_path(default, overrides, laziness=mode)
+    results = {}
+    results['startup'] = _median_time(lambda: None, lambda _: build(), repeat) * 1e3
+    results['first_access'] = _median_time(build, lambda cfg: access(cfg, path), repeat) * 1e3
+
+    cfg = build()
+    access(cfg, path)
+    seconds = timeit.timeit(lambda: access(cfg, path), number=REPEAT_ACCESS_NUMBER)
+    results['repeat_access'] = seconds / REPEAT_ACCESS_NUMBER * 1e6
+
+    def preloaded(): # all layers in memory: measures the resolution, not the IO
+        cfg = build()
+        layers = [cfg._config, *cfg._override]
+        for layer in layers:
+            layer.force_load()
+        # a new Config instead of resetting the caches of cfg, works with every version
+        return lazyConfig.Config(layers[0], layers[1:])
+    results['override_resolution'] = _median_time(
+        preloaded, lambda cfg: access(cfg, path), repeat) * 1e6
+    results['as_dict'] = _median_time(build, lambda cfg: cfg.as_dict(), repeat) * 1e3
+
+    tracemalloc.start()
+    build().as_dict()
+    results['peak_memory'] = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    return results
+
+def run(spec: TreeSpec, modes, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory() as root:
+        default, overrides = generate_tree(root, spec)
+        lazyConfig.from_path(default, overrides).as_dict() # warm the file system cache
+        return {mode.name: measure(default, overrides, spec, mode, repeat) for mode in modes}
+
+def print_results(results: dict, baseline: dict = None):
+    for mode, metrics in results.items():
+        print(mode)
+        for metric, value in metrics.items():
+            line = f"  {metric:<20} {value:12.2f} {UNITS[metric]:<3}"
+            if baseline and metric in baseline.get(mode, {}):
+                old = baseline[mode][metric]
+                line += f"  ({_change(old, value):+7.1%} vs {old:.2f})"
+            print(line)
+
+def _change(old: float, new: float) -> float:
+    return (new - old) / old if old else 0.0
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list:
+    """ (mode, metric, old, new) of the metrics which got worse by more than tolerance """
+    found = []
+    for mode, metrics in results.items():
+        for metric, new in metrics.items():
+            old = baseline.get(mode, {}).get(metric)
+            if old is not None and _change(old, new) > tolerance:
+                found.append((mode, metric, old, new))
+    return found
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_spec_arguments(parser)
+    parser.add_argument('--modes', nargs='+', default=[mode.name for mode in LazyMode],
+                        help='LazyModes to measure, the ones this version lacks are skipped')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per metric (median)')
+    parser.add_argument('--save', metavar='FILE', help='write the results as JSON')
+    parser.add_argument('--compare', metavar='FILE', help='results of a previous --save')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='relative slowdown reported as regression (default 0.2)')
+    args = parser.parse_args(argv)
+    spec = spec_from_args(args)
+
+    print(f"{spec}: {spec.directories()} directories per layer")
+    missing = [mode for mode in args.modes if not hasattr(LazyMode, mode)]
+    if missing: # e.g. BOUNDED when measuring an older version for a baseline
+        print(f"skipping modes not available in this version: {', '.join(missing)}")
+    modes = [LazyMode[mode] for mode in args.modes if hasattr(LazyMode, mode)]
+    results = run(spec, modes, args.repeat)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            saved = json.load(f)
+        if saved['spec'] != spec._asdict():
+            print(f"warning: {args.compare} was measured on a different tree: {saved['spec']}")
+        baseline = saved['results']
+    print_results(results, baseline)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'spec': spec._asdict(), 'results': results}, f, indent=2)
+
+    if baseline:
+        found = regressions(results, baseline, args.tolerance)
+        for mode, metric, old, new in found:
+            print(f"REGRESSION {mode} {metric}: {old:.2f} -> {new:.2f} {UNITS[metric]}")
+        return 1 if found else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
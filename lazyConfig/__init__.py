@@ -1,5 +1,21 @@
 #!/usr/bin/env python
 
-from .lazyData import LazyDict, LazyList, LazyMode
-from .config import Config, ConfigList
-from .factory import from_env, from_path, from_primitive
+from .lazyData import LazyDict, LazyList, PackedList, LazyMode, LRUCache
+from .parseCache import ParseCache
+from .storage import FileStorage, ZipStorage
+from .kvStorage import KVStorage
+from .partialJson import JSONView, JSONListView, PartialJSONLoader
+from .parsers import (
+    register_backend, select_backend, available_backends, active_backend, active_backends,
+    loader_key
+)
+from .stats import Stats
+from .config import Config, ConfigList, Binding
+from .factory import from_env, from_path, from_primitive, afrom_path, from_archive, from_kv
+from .compiled import CompiledConfig, CompiledList, compile
+from .watcher import Watcher
+from .export import iter_items, dump_json, dump_yaml
+from .query import select
+from .fingerprints import fingerprint, diff, MISSING
+from .shared import publish, attach
+from .prefetch import AccessProfile, save_profile, prefetch
@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+
+from __future__ import annotations
+from typing import Union
+from collections.abc import Sequence, Mapping
+from types import MappingProxyType
+
+from .config import Config, ConfigList, KEY_ERROR_NOTE
+
+PATH_SEP = '.'
+
+
+class CompiledConfig(Mapping):
+    """ immutable snapshot of a Config with all overrides already applied
+
+    every node of the snapshot shares one flat index mapping dotted paths
+    (e.g. 'database.connection.hosts.0.host') to their resolved value, so
+    lookups never touch the underlying files or override layers again.
+    Nodes are hashable, the hash is computed on first use.
+    """
+    __slots__ = ('_children', '_index', '_prefix', '_frozen', '_views', '_hash')
+
+    def __init__(self, children: dict, index: dict, prefix: str = '', frozen: bool = False):
+        self._children = children
+        self._index = index
+        self._prefix = prefix
+        self._frozen = frozen
+        self._views = None # strip_none -> read only view of as_dict, frozen only
+        self._hash = None
+
+    def __getattr__(self, name) -> Union[CompiledConfig, CompiledList]:
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(
+                f'no configuration called {name}.\n' + KEY_ERROR_NOTE
+            ) from None
+
+    def __getitem__(self, key):
+        try:
+            return self._children[key]
+        except KeyError:
+            pass
+        try: # dotted path relative to this node
+            return self._index[self._prefix + key]
+        except (KeyError, TypeError):
+            raise KeyError(
+                f'the (default) configuration has no key {key}.\n'
+                + KEY_ERROR_NOTE
+            ) from None
+
+    def as_primitive(self):
+        """ alias for as_dict """
+        return self.as_dict(strip_none=False)
+
+    def as_dict(self, strip_none = True) -> Mapping:
+        """ return the snapshot as (new) primitive dictionary, a frozen snapshot
+        returns a read only view (MappingProxyType with tuples for lists) instead,
+        which is built once and shared by all calls
+
+        Args:
+            strip_none (bool, optional): delete keys with value None. Defaults to True.
+        """
+        if self._frozen:
+            if self._views is None:
+                self._views = {}
+            try:
+                return self._views[strip_none]
+            except KeyError:
+                pass
+        result = {
+            key: _as_primitive(value, strip_none) for key, value in self._children.items()
+            if not (strip_none and value is None)
+        }
+        if self._frozen:
+            return self._views.setdefault(strip_none, MappingProxyType(result))
+        return result
+
+    def compile(self) -> CompiledConfig:
+        """ already compiled """
+        return self
+
+    def __dir__(self) -> list:
+        return list(self._children.keys())
+
+    def __len__(self):
+        return len(self._children)
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(frozenset(self._children.items()))
+        return self._hash
+
+    def __iter__(self):
+        return iter(self._children)
+
+    def __repr__(self) -> str:
+        return f"CompiledConfig(prefix={repr(self._prefix)}, keys={list(self._children)})"
+
+    def __str__(self) -> str:
+        return f"configuration keys: {dir(self)}"
+
+
+class CompiledList(Sequence):
+    """ immutable list node of a CompiledConfig snapshot """
+    __slots__ = ('_items', '_frozen', '_view')
+
+    def __init__(self, items: tuple, frozen: bool = False):
+        self._items = items
+        self._frozen = frozen
+        self._view = None # as_list of a frozen snapshot
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return CompiledList(self._items[key], self._frozen)
+        if isinstance(key, tuple):
+            return CompiledList(tuple(self._items[x] for x in key), self._frozen)
+        return self._items[key]
+
+    def as_primitive(self):
+        """ alias for as_list """
+        return self.as_list()
+
+    def as_list(self) -> Sequence:
+        """ return the snapshot as (new) primitive list, a frozen snapshot returns
+        a tuple of read only views instead, see CompiledConfig.as_dict
+        """
+        if not self._frozen:
+            return [_as_primitive(value, False) for value in self._items]
+        if self._view is None:
+            self._view = tuple(_as_primitive(value, False) for value in self._items)
+        return self._view
+
+    def __len__(self):
+        return len(self._items)
+
+    def __hash__(self):
+        return hash(self._items)
+
+    def __repr__(self):
+        return f"CompiledList({repr(self._items)})"
+
+    def __eq__(self, other):
+        if (length:=len(self)) == len(other):
+            for idx in range(length):
+                if self[idx] != other[idx]:
+                    return False
+            return True
+        return False
+
+
+def compile(
+    config: Union[Config, ConfigList], frozen: bool = False
+) -> Union[CompiledConfig, CompiledList]:
+    """ resolve the default configuration and all overrides once
+
+    Args:
+        config (Union[Config, ConfigList]): configuration to take a snapshot of.
+            Files which are not loaded yet are loaded, but the configuration
+            itself is not modified.
+        frozen (bool, optional): as_dict(), as_list() and as_primitive() return
+            read only views which are built once (None stripped included) and
+            shared instead of new primitive containers. Defaults to False.
+
+    Returns:
+        Union[CompiledConfig, CompiledList]: immutable snapshot with the same
+        attribute/item access as `config`. Later overrides or file changes are
+        not reflected.
+    """
+    index = {}
+    return _compile(config, '', index, frozen)
+
+def _compile(node, path: str, index: dict, frozen: bool):
+    if isinstance(node, Mapping):
+        prefix = path + PATH_SEP if path else ''
+        children = {}
+        for key in node:
+            child_path = prefix + str(key)
+            children[key] = index[child_path] = _compile(node[key], child_path, index, frozen)
+        return CompiledConfig(children, index, prefix, frozen)
+    if isinstance(node, (ConfigList, list)):
+        prefix = path + PATH_SEP if path else ''
+        items = []
+        for idx in range(len(node)):
+            child_path = prefix + str(idx)
+            items.append(_compile(node[idx], child_path, index, frozen))
+            index[child_path] = items[-1]
+        return CompiledList(tuple(items), frozen)
+    return node
+
+def _as_primitive(value, strip_none: bool):
+    if isinstance(value, CompiledConfig):
+        return value.as_dict(strip_none)
+    if isinstance(value, CompiledList):
+        return value.as_list()
+    return value
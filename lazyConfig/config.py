@@ -1,14 +1,21 @@
 #!/usr/bin/env python
 
 from __future__ import annotations
-from typing import Union, List
+from typing import Union, List, Optional
 from collections.abc import Sequence, Mapping
-import os
+import os, copy, asyncio
+from contextvars import ContextVar, copy_context
 
 from deprecation import deprecated
 
 import lazyConfig
-from .lazyData import LazyDict, LazyList
+from .lazyData import LazyDict, LazyList, LazyMode
+from .partialJson import JSONView, JSONListView
+from .stats import Stats, emit
+from .shared import SharedView, SharedListView
+
+# lists and views of lists, which become a ConfigList
+_LIST_TYPES = (list, LazyList, JSONListView, SharedListView)
 
 KEY_ERROR_NOTE = (
     'Note: you can only override existing keys. Document possible '
@@ -30,7 +37,7 @@ def override_mapping(target: Mapping, override: Mapping):
         else:
             if isinstance(value, Mapping):
                 override_mapping(target[key], value)
-            elif isinstance(value, LazyList):
+            elif isinstance(value, (LazyList, JSONListView, SharedListView)):
                 target[key] = value.as_list()
             else:
                 target[key] = value
@@ -54,10 +61,72 @@ def yield_values_for_key(list_of_dicts: List[Mapping], key):
         except KeyError:
             pass
 
+def _is_lazy(data) -> bool:
+    """ whether data may read its files again (LazyMode.LAZY or bounded caches),
+    memoizing its children would defeat that
+    """
+    if isinstance(data, LazyList) and data._max_cached:
+        return True
+    return isinstance(data, (LazyDict, LazyList)) and data._laziness in (
+        LazyMode.LAZY, LazyMode.BOUNDED)
+
+async def _aprefetch(lazy_dict: LazyDict, key):
+    try:
+        await lazy_dict.aget(key)
+    except KeyError:
+        pass
+
+# overlays of the current thread/asyncio task: tuple of (root Config, path, Mapping)
+_OVERLAYS: ContextVar[tuple] = ContextVar('lazyConfig_overlays', default=())
+_MISSING = object()
+
+def _descend(mapping: Mapping, overlay_path: tuple, path: tuple) -> Optional[Mapping]:
+    """ the part of an overlay registered at overlay_path which applies to path """
+    if path[:len(overlay_path)] != overlay_path:
+        return None
+    for key in path[len(overlay_path):]:
+        try:
+            mapping = mapping[key]
+        except (KeyError, IndexError, TypeError):
+            return None
+        if not isinstance(mapping, Mapping):
+            return None
+    return mapping
+
+def _nested_override(node: Union[Config, ConfigList], keys: tuple, override: Mapping):
+    """ override for node applying `override` to the Config at keys below it, lists
+    on the way are replaced by copies with the element overridden
+    """
+    if not keys:
+        return override
+    key = keys[0]
+    child = node._lookup(key) if isinstance(node, Config) else node[key]
+    inner = _nested_override(child, keys[1:], override)
+    if isinstance(node, Config):
+        return {key: inner}
+    values = copy.deepcopy(node.as_list())
+    if isinstance(inner, Mapping):
+        override_mapping(values[key], inner)
+    else: # an element of a nested list
+        values[key] = inner
+    return values
+
 class Config(Mapping):
+    __slots__ = (
+        '_config', '_override', '_cache', '_cacheable', '_root', '_path', '_hooks',
+        '_generation', '_fingerprint', '__weakref__'
+    )
+
     def __init__(self, config: Mapping, override: list):
         self._config = config
         self._override = override
+        self._cache = {}
+        self._cacheable = not any(map(_is_lazy, [config, *override]))
+        self._root = None # Config this one was obtained from by key access, None if root
+        self._path = () # keys leading from the root to this Config
+        self._hooks = () # of the root, see lazyConfig.stats
+        self._generation = 0 # of the root, changes whenever a Config of the tree is invalidated
+        self._fingerprint = None # see lazyConfig.fingerprints
 
     def __getattr__(self, name) -> Union[Config, ConfigList]:
         try:
@@ -68,6 +137,118 @@ class Config(Mapping):
             ) from None
 
     def __getitem__(self, key):
+        if overlays := _OVERLAYS.get():
+            value = self._overlaid(key, overlays)
+            if value is not _MISSING:
+                return value
+        return self._lookup(key)
+
+    def _lookup(self, key):
+        """ memoized _resolve """
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        value = self._resolve(key)
+        if self._cacheable:
+            self._cache[key] = value
+        root = self._root if self._root is not None else self
+        if root._hooks:
+            emit(root._hooks, 'resolve', path=self._path + (key,),
+                 layers=self._layers_consulted(key, value))
+        return value
+
+    def _layers_consulted(self, key, value) -> int:
+        """ number of layers _resolve looked at for key """
+        if isinstance(value, Config): # merges all layers
+            return 1 + len(self._override)
+        for layers, layer in enumerate(reversed(self._override), 1):
+            if key in layer:
+                return layers
+        return 1 + len(self._override)
+
+    def stats(self) -> dict:
+        """ statistics about loading and accessing this configuration, see lazyConfig.Stats
+
+        Raises:
+            ValueError: if the Config was not built with from_path(..., stats=True)
+        """
+        root = self._root if self._root is not None else self
+        for hook in root._hooks:
+            if isinstance(hook, Stats):
+                return hook.as_dict()
+        raise ValueError(
+            'no statistics recorded, build the Config with lazyConfig.from_path(..., stats=True)')
+
+    def save_profile(self, path: str):
+        """ write the keys accessed so far for from_path(..., prefetch_profile=path),
+        see lazyConfig.prefetch
+
+        Raises:
+            ValueError: if the Config was not built with from_path(..., record_profile=True)
+        """
+        lazyConfig.save_profile(self, path)
+
+    def overlay(self, override: Mapping, none_can_override = False):
+        """ context manager applying override on top of this Config for the current
+        thread or asyncio task only, e.g. per request
+
+            with config.overlay({'database': {'connection': {'timeout': 1}}}):
+                config.database.connection.timeout # 1
+
+        like add_override only existing keys can be overridden. Nothing is copied,
+        entering and exiting costs O(number of top level keys in override).
+
+        Args:
+            override (Mapping): the Mapping trumping all layers while active
+            none_can_override (bool, optional): see add_override. Defaults to False.
+        """
+        if not none_can_override:
+            override = {key:value for key, value in override.items() if value is not None}
+        root = self._root if self._root is not None else self
+        return _Overlay(self, (root, self._path, override))
+
+    def _overlaid(self, key, overlays: tuple):
+        """ the value of key in the innermost active overlay, _MISSING if none has it """
+        root = self._root if self._root is not None else self
+        for overlay_root, overlay_path, mapping in reversed(overlays):
+            if overlay_root is not root:
+                continue
+            mapping = _descend(mapping, overlay_path, self._path)
+            if mapping is not None and key in mapping:
+                break
+        else:
+            return _MISSING
+        base = self._lookup(key)
+        if isinstance(base, Config): # nested keys are overlaid by the child itself
+            return base
+        if isinstance(base, ConfigList):
+            return ConfigList(mapping[key])
+        return mapping[key]
+
+    async def aget(self, key):
+        """ self[key] without blocking the event loop, files are read in the
+        default executor (see LazyDict.aget)
+        """
+        if not _OVERLAYS.get():
+            try:
+                return self._cache[key]
+            except KeyError:
+                pass
+        if not self._cacheable: # LazyMode.LAZY would read the files again
+            return await asyncio.get_running_loop().run_in_executor(
+                None, copy_context().run, self.__getitem__, key)
+        await asyncio.gather(*(
+            _aprefetch(layer, key) for layer in [self._config, *self._override]
+            if isinstance(layer, LazyDict)
+        ))
+        return self[key]
+
+    async def aforce_load(self, workers: Optional[int] = None):
+        """ force_load in the default executor, see force_load """
+        await asyncio.get_running_loop().run_in_executor(None, self.force_load, workers)
+
+    def _resolve(self, key):
         try:
             default = self._config[key]
         except KeyError:
@@ -77,14 +258,22 @@ class Config(Mapping):
             ) from None
         if isinstance(default, Mapping):
             config = [value for value in yield_values_for_key(self._override, key)]
-            return Config(default, config)
-        if isinstance(default, (LazyList, list)):
+            child = Config(default, config)
+            child._root = self._root if self._root is not None else self
+            child._path = self._path + (key,)
+            return child
+        if isinstance(default, _LIST_TYPES):
             for cfg in self._override[::-1]:
                 try:
-                    return ConfigList(cfg[key])
+                    value = ConfigList(cfg[key])
+                    break
                 except KeyError:
                     pass
-            return ConfigList(default)
+            else:
+                value = ConfigList(default)
+            value._root = self._root if self._root is not None else self
+            value._path = self._path + (key,)
+            return value
 
         for cfg in self._override[::-1]:
             try:
@@ -97,38 +286,110 @@ class Config(Mapping):
         """ alias for as_dict """
         return self.as_dict(strip_none=False)
 
-    def as_dict(self, strip_none = True) -> dict:
+    def as_dict(self, strip_none = True, workers: Optional[int] = None) -> dict:
         """return configuration as primitive dictionary, causes a force_load()
         to the underlying dictionary
 
         Args:
             strip_none (bool, optional): delete keys with value None. Defaults to True.
+            workers (int, optional): number of threads loading files concurrently,
+                see LazyDict.force_load. Defaults to None (sequential).
 
         Returns:
             dict: a dictionary composed from the default configuration and all overrides
         """        
         result = self._config # note that result and thus self._config is modified!
         if isinstance(result, LazyDict):
+            result = result.as_dict(workers)
+        elif isinstance(result, (JSONView, SharedView)):
             result = result.as_dict()
         for cfg in self._override:
             if isinstance(cfg, LazyDict):
-                cfg = cfg.as_dict()
+                cfg = cfg.as_dict(workers)
             override_mapping(result, cfg)
         self._config = result
         self._override = []
+        self._invalidate()
         if strip_none:
             result = strip_none_from_mapping(result)
         return result
 
-    def force_load(self):
+    def iter_items(self, strip_none = True):
+        """ yield (dotted path, value) of every leaf without materializing the
+        configuration, see lazyConfig.iter_items()
+        """
+        return lazyConfig.iter_items(self, strip_none)
+
+    def dump_json(self, fp, strip_none = True, indent: Optional[int] = None):
+        """ stream the configuration as JSON to fp, see lazyConfig.dump_json() """
+        lazyConfig.dump_json(self, fp, strip_none, indent)
+
+    def dump_yaml(self, fp, strip_none = True):
+        """ stream the configuration as YAML to fp, see lazyConfig.dump_yaml() """
+        lazyConfig.dump_yaml(self, fp, strip_none)
+
+    def select(self, patterns, workers: Optional[int] = None) -> dict:
+        """ values of all (dotted, glob) paths resolving shared prefixes once and
+        loading the needed files level by level in batches, see lazyConfig.select()
+        """
+        return lazyConfig.select(self, patterns, workers)
+
+    def publish(self, path: str, strip_none = False):
+        """ write the configuration to path for other processes, see lazyConfig.publish() """
+        lazyConfig.publish(self, path, strip_none)
+
+    def force_load(self, workers: Optional[int] = None):
         """ load all lazy Dictionaries and perform all overrides
+
+        Args:
+            workers (int, optional): number of threads loading files concurrently.
+                Defaults to None (sequential).
         """        
-        self.as_dict()
+        self.as_dict(workers=workers)
+
+    def refresh(self) -> bool:
+        """ reload changed files and directories of all layers, see LazyDict.refresh
+
+        children obtained before are not updated, access them through this
+        Config again. Has no effect after as_dict() or force_load() since they
+        replace the layers with primitive dictionaries.
+
+        Returns:
+            bool: whether anything changed
+        """
+        changed = False
+        for layer in [self._config, *self._override]:
+            if isinstance(layer, LazyDict):
+                changed = layer.refresh() or changed
+        if changed:
+            self._invalidate()
+        return changed
+
+    def watch(self, interval: float = 1.0, callback = None) -> lazyConfig.Watcher:
+        """ refresh() every `interval` seconds in a background thread
+
+        Args:
+            interval (float, optional): seconds between two refreshs. Defaults to 1.0.
+            callback (Callable[[Config], None], optional): called with this Config
+                after a refresh found changes. Defaults to None.
+
+        Returns:
+            lazyConfig.Watcher: call its stop() method to stop watching
+        """
+        return lazyConfig.Watcher(self, interval, callback)
+
+    def compile(self, frozen = False) -> lazyConfig.CompiledConfig:
+        """ immutable snapshot with all overrides resolved, see lazyConfig.compile() """
+        return lazyConfig.compile(self, frozen)
 
     def add_override(self, override:Mapping, none_can_override = False):
         """add another override to the list of overrides trumping all previous ones
 
-        this can be used to override configuration with command line arguments
+        this can be used to override configuration with command line arguments.
+        On a child (e.g. config.database or an element of a list) the override is
+        recorded at the root under the path of the child as well, so it is part of
+        the whole configuration. Lists are replaced as a whole by overrides, so for
+        an element the list with the element overridden is recorded.
 
         Args:
             override (Mapping): the Mapping to append
@@ -139,6 +400,54 @@ class Config(Mapping):
         if not none_can_override:
             override = {key:value for key, value in override.items() if value is not None}
         self._override.append(override)
+        self._invalidate()
+        if self._root is not None: # children are memoized and dropped on invalidation
+            root = self._root
+            root._override.append(_nested_override(root, self._path, override))
+            root._invalidate()
+
+    def bind(self, path: Union[str, tuple]) -> Binding:
+        """ handle to the value at path (relative to this Config) for hot code paths
+
+            hosts = config.bind('database.connection.hosts')
+            hosts.get() # resolved once, afterwards O(1)
+
+        the handle resolves the path again after overrides were added or the
+        configuration was refreshed, and inside overlays.
+
+        Args:
+            path (Union[str, tuple]): dotted path or tuple of keys, list indices
+                can be given as digits
+        """
+        keys = tuple(path.split('.')) if isinstance(path, str) else tuple(path)
+        root = self._root if self._root is not None else self
+        return Binding(root, self._path + keys)
+
+    def _invalidate(self):
+        """ drop memoized children after the layers changed """
+        self._cache = {}
+        self._cacheable = not any(map(_is_lazy, [self._config, *self._override]))
+        self._fingerprint = None
+        root = self._root if self._root is not None else self
+        root._generation += 1
+        root._fingerprint = None
+
+    def fingerprint(self) -> bytes:
+        """ digest of the content of all layers, see lazyConfig.fingerprint() """
+        return lazyConfig.fingerprint(self)
+
+    def diff(self, other: Config) -> dict:
+        """ dotted path -> (value here, value in other) of all differing leaves,
+        unchanged subtrees are skipped by their fingerprints, see lazyConfig.diff()
+        """
+        return lazyConfig.diff(self, other)
+
+    def __eq__(self, other):
+        if isinstance(other, Config):
+            return self is other or lazyConfig.fingerprints.equal(self, other)
+        return super().__eq__(other)
+
+    __hash__ = None
 
     def __dir__(self) -> list:
         return list(self._config.keys())
@@ -170,17 +479,112 @@ class Config(Mapping):
             [path for x in override if (path := os.environ.get(x))]
         )
 
+class Binding:
+    """ handle returned by Config.bind """
+    __slots__ = ('_root', '_keys', '_generation', '_value')
+
+    def __init__(self, root: Config, keys: tuple):
+        self._root = root
+        self._keys = keys
+        self._generation = None # of the root when _value was resolved
+        self._value = None
+
+    def get(self):
+        """ the current value at the path """
+        if self._generation == self._root._generation and not _OVERLAYS.get():
+            return self._value
+        value = self._resolve()
+        if self._root._cacheable and not _OVERLAYS.get(): # LazyMode.LAZY reads every time
+            self._value = value
+            self._generation = self._root._generation
+        return value
+
+    __call__ = get
+
+    def _resolve(self):
+        value = self._root
+        for key in self._keys:
+            if isinstance(value, ConfigList) and isinstance(key, str):
+                key = int(key)
+            value = value[key]
+        return value
+
+    @property
+    def path(self) -> str:
+        return '.'.join(map(str, self._keys))
+
+    def __repr__(self):
+        return f"Binding(path='{self.path}')"
+
+class _Overlay:
+    """ context manager activating an overlay, see Config.overlay
+
+    nothing about an activation is stored in the object itself, so one overlay
+    can be shared by several threads and asyncio tasks
+    """
+    def __init__(self, config: Config, overlay: tuple):
+        self._config = config
+        self._overlay = overlay
+
+    def __enter__(self) -> Config:
+        _OVERLAYS.set(_OVERLAYS.get() + (self._overlay,))
+        return self._config
+
+    def __exit__(self, *exc_info):
+        # with blocks nest: the innermost activation of the current context is this one
+        overlays = _OVERLAYS.get()
+        for idx in range(len(overlays) - 1, -1, -1):
+            if overlays[idx] is self._overlay:
+                _OVERLAYS.set(overlays[:idx] + overlays[idx + 1:])
+                return
+
 class ConfigList(Sequence):
+    __slots__ = ('list', '_cache', '_cacheable', '_root', '_path', '__weakref__')
+
     def __init__(self, raw_list: Union[list, LazyList]):
         self.list = raw_list
+        self._cache = {}
+        self._cacheable = not _is_lazy(raw_list)
+        self._root = None # Config this list was obtained from by key access, see Config
+        self._path = () # keys leading from the root to this list
 
     def __getitem__(self, key):
-        res = self.list[key]
+        if isinstance(key, int):
+            try:
+                return self._cache[key]
+            except KeyError:
+                pass
+            value = self._wrap(self.list[key], key % len(self.list))
+            if self._cacheable:
+                self._cache[key] = value
+            return value
+        return self._wrap(self.list[key])
+
+    async def aget(self, key: int):
+        """ self[key] without blocking the event loop """
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        return await asyncio.get_running_loop().run_in_executor(
+            None, copy_context().run, self.__getitem__, key)
+
+    def _wrap(self, res, idx: Optional[int] = None):
+        """ Config or ConfigList for elements, the element at idx is a child of the root """
         if isinstance(res, Mapping):
-            return Config(res, [])
-        if isinstance(res, list):
-            return ConfigList(res)
-        return res
+            value = Config(res, [])
+        elif isinstance(res, _LIST_TYPES):
+            value = ConfigList(res)
+        else:
+            return res
+        if idx is not None and self._root is not None:
+            value._root = self._root
+            value._path = self._path + (idx,)
+        return value
+
+    def compile(self, frozen = False) -> lazyConfig.CompiledList:
+        """ immutable snapshot with all overrides resolved, see lazyConfig.compile() """
+        return lazyConfig.compile(self, frozen)
 
     def as_primitive(self):
         """ alias for as_list()"""
@@ -199,6 +603,12 @@ class ConfigList(Sequence):
         return f"ConfigList({repr(self.list)})"
 
     def __eq__(self, other):
+        if (isinstance(other, ConfigList) and isinstance(self.list, LazyList)
+                and isinstance(other.list, LazyList)
+                and lazyConfig.fingerprint(self) == lazyConfig.fingerprint(other)
+                and not lazyConfig.fingerprints.modified(self)
+                and not lazyConfig.fingerprints.modified(other)):
+            return True
         if (length:=len(self)) == len(other):
             for idx in range(length):
                 if self[idx] != other[idx]:
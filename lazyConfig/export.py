@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+""" stream the merged configuration without materializing it
+
+Unlike Config.as_dict() nothing is kept: files are loaded when they are
+visited and released afterwards, so only the contents of the current file
+(of every layer) are in memory at a time. The lazy structure of the Config
+is left intact.
+"""
+
+from typing import Any, Iterator, Tuple, Union, TextIO, Optional
+from collections.abc import Sequence, Mapping
+import json
+
+import yaml
+from yaml.events import (
+    StreamStartEvent, StreamEndEvent, DocumentStartEvent, DocumentEndEvent,
+    MappingStartEvent, MappingEndEvent, SequenceStartEvent, SequenceEndEvent
+)
+
+from .lazyData import LazyDict, LazyList
+from .config import Config, ConfigList
+from .compiled import PATH_SEP
+
+
+def iter_items(
+    config: Union[Config, ConfigList], strip_none: bool = True
+) -> Iterator[Tuple[str, Any]]:
+    """ yield (dotted path, value) for every leaf of the merged configuration
+
+    Args:
+        config (Union[Config, ConfigList]): the configuration to export
+        strip_none (bool, optional): skip keys with value None like as_dict().
+            Defaults to True.
+
+    Example:
+        ('database.connection.hosts.0.host', 'localhost')
+    """
+    if isinstance(config, ConfigList):
+        yield from _iter_sequence(config.list, '', strip_none)
+    else:
+        yield from _iter_mapping(config._config, config._override, '', strip_none)
+
+def _iter_mapping(default: Mapping, overrides: list, prefix: str, strip_none: bool):
+    for key, value, sub_overrides in _members(default, overrides):
+        if strip_none and value is None:
+            continue
+        path = prefix + str(key)
+        if sub_overrides is not None:
+            yield from _iter_mapping(value, sub_overrides, path + PATH_SEP, strip_none)
+        elif _is_sequence(value):
+            yield from _iter_sequence(value, path + PATH_SEP, strip_none)
+        else:
+            yield path, value
+
+def _iter_sequence(sequence: Sequence, prefix: str, strip_none: bool):
+    for idx, value in _elements(sequence):
+        path = prefix + str(idx)
+        if isinstance(value, Mapping):
+            yield from _iter_mapping(value, [], path + PATH_SEP, strip_none)
+        elif _is_sequence(value):
+            yield from _iter_sequence(value, path + PATH_SEP, strip_none)
+        else:
+            yield path, value
+
+
+def dump_json(
+    config: Union[Config, ConfigList], fp: TextIO,
+    strip_none: bool = True, indent: Optional[int] = None
+):
+    """ write the merged configuration as JSON to fp while loading it file by file
+
+    Args:
+        config (Union[Config, ConfigList]): the configuration to export
+        fp (TextIO): writable text stream
+        strip_none (bool, optional): skip keys with value None. Defaults to True.
+        indent (int, optional): pretty print with this indentation. Defaults to None.
+    """
+    writer = _JSONWriter(fp, strip_none, indent)
+    if isinstance(config, ConfigList):
+        writer.sequence(config.list, 0)
+    else:
+        writer.mapping(config._config, config._override, 0)
+    fp.write('\n')
+
+class _JSONWriter:
+    def __init__(self, fp: TextIO, strip_none: bool, indent: Optional[int]):
+        self.fp = fp
+        self.strip_none = strip_none
+        self.indent = indent
+
+    def _separator(self, first: bool, depth: int):
+        if not first:
+            self.fp.write(',')
+        if self.indent is not None:
+            self.fp.write('\n' + ' ' * (self.indent * depth))
+
+    def _close(self, bracket: str, empty: bool, depth: int):
+        if self.indent is not None and not empty:
+            self.fp.write('\n' + ' ' * (self.indent * depth))
+        self.fp.write(bracket)
+
+    def mapping(self, default: Mapping, overrides: list, depth: int):
+        self.fp.write('{')
+        first = True
+        for key, value, sub_overrides in _members(default, overrides):
+            if self.strip_none and value is None:
+                continue
+            self._separator(first, depth + 1)
+            first = False
+            self.fp.write(json.dumps(str(key)) + (': ' if self.indent is not None else ':'))
+            self.value(value, sub_overrides, depth + 1)
+        self._close('}', first, depth)
+
+    def sequence(self, sequence: Sequence, depth: int):
+        self.fp.write('[')
+        first = True
+        for _, value in _elements(sequence):
+            self._separator(first, depth + 1)
+            first = False
+            self.value(value, None, depth + 1)
+        self._close(']', first, depth)
+
+    def value(self, value, sub_overrides, depth: int):
+        if isinstance(value, Mapping):
+            self.mapping(value, sub_overrides or [], depth)
+        elif _is_sequence(value):
+            self.sequence(value, depth)
+        else:
+            self.fp.write(json.dumps(value))
+
+
+def dump_yaml(config: Union[Config, ConfigList], fp: TextIO, strip_none: bool = True):
+    """ write the merged configuration as YAML to fp while loading it file by file
+
+    Args:
+        config (Union[Config, ConfigList]): the configuration to export
+        fp (TextIO): writable text stream
+        strip_none (bool, optional): skip keys with value None. Defaults to True.
+    """
+    dumper = yaml.SafeDumper(fp, default_flow_style=False, sort_keys=False)
+    writer = _YAMLWriter(dumper, strip_none)
+    dumper.emit(StreamStartEvent())
+    dumper.emit(DocumentStartEvent(explicit=False))
+    if isinstance(config, ConfigList):
+        writer.sequence(config.list)
+    else:
+        writer.mapping(config._config, config._override)
+    dumper.emit(DocumentEndEvent(explicit=False))
+    dumper.emit(StreamEndEvent())
+    dumper.dispose()
+
+class _YAMLWriter:
+    def __init__(self, dumper: yaml.SafeDumper, strip_none: bool):
+        self.dumper = dumper
+        self.strip_none = strip_none
+
+    def mapping(self, default: Mapping, overrides: list):
+        self.dumper.emit(MappingStartEvent(None, None, True, flow_style=False))
+        for key, value, sub_overrides in _members(default, overrides):
+            if self.strip_none and value is None:
+                continue
+            self.scalar(key)
+            self.value(value, sub_overrides)
+        self.dumper.emit(MappingEndEvent())
+
+    def sequence(self, sequence: Sequence):
+        self.dumper.emit(SequenceStartEvent(None, None, True, flow_style=False))
+        for _, value in _elements(sequence):
+            self.value(value, None)
+        self.dumper.emit(SequenceEndEvent())
+
+    def value(self, value, sub_overrides):
+        if isinstance(value, Mapping):
+            self.mapping(value, sub_overrides or [])
+        elif _is_sequence(value):
+            self.sequence(value)
+        else:
+            self.scalar(value)
+
+    def scalar(self, value):
+        """ represent and emit a single leaf with the usual yaml tags and styles """
+        dumper = self.dumper
+        node = dumper.represent_data(value)
+        dumper.anchor_node(node)
+        dumper.serialize_node(node, None, None)
+        dumper.represented_objects = {}
+        dumper.object_keeper = []
+        dumper.alias_key = None
+        dumper.anchors = {}
+        dumper.serialized_nodes = {}
+
+
+def _get(layer, key):
+    if isinstance(layer, (LazyDict, LazyList)):
+        return layer._peek(key)
+    return layer[key]
+
+def _members(default: Mapping, overrides: list):
+    """ resolve the overrides of the keys of default, like Config.__getitem__
+
+    yields (key, value, overriding mappings) for mappings, (key, value, None)
+    for everything else with value already overridden
+    """
+    for key in default:
+        value = _get(default, key)
+        if isinstance(value, Mapping):
+            sub_overrides = []
+            for layer in overrides:
+                try:
+                    override = _get(layer, key)
+                except KeyError:
+                    continue
+                if isinstance(override, Mapping):
+                    sub_overrides.append(override)
+            yield key, value, sub_overrides
+            continue
+        for layer in reversed(overrides):
+            try:
+                value = _get(layer, key)
+                break
+            except KeyError:
+                pass
+        yield key, value, None
+
+def _elements(sequence: Sequence):
+    for idx in range(len(sequence)):
+        yield idx, _get(sequence, idx)
+
+def _is_sequence(value) -> bool:
+    return isinstance(value, Sequence) and not isinstance(value, (str, bytes))
@@ -1,17 +1,35 @@
-import os, yaml, json
+import os, yaml, json, asyncio, functools, zipfile
 
-from typing import Dict, Callable, Union, List
+from typing import Dict, Callable, Union, List, Optional, Tuple, Sequence as SequenceType
 from _io import TextIOWrapper
 from collections.abc import Sequence, Mapping
 
 from .config import Config, ConfigList
-from .lazyData import LazyList, LazyDict, LazyMode, DEFAULT_EXTENSION_MAP
+from .lazyData import (
+    LazyList, LazyDict, LazyMode, LRUCache, DEFAULT_EXTENSION_MAP, DEFAULT_BOUNDED_ENTRIES,
+    _TreeOptions
+)
+from .parseCache import ParseCache, DEFAULT_CACHE_SIZE
+from .stats import Stats, Hook
+from .prefetch import AccessProfile, prefetch
+from .storage import FileStorage, ZipStorage, FILE_STORAGE
+from .kvStorage import KVStorage, DEFAULT_BATCH_SIZE, DEFAULT_POOL_SIZE
 
 def from_env(
     config: str = 'CONFIG', 
     override: str = 'CONFIG_OVERRIDE',
     laziness: LazyMode = LazyMode.CACHED,
-    custom_extension_loader: Dict[str, Callable[[TextIOWrapper], Union[dict, list]]] = {}
+    custom_extension_loader: Dict[str, Callable[[TextIOWrapper], Union[dict, list]]] = {},
+    cache_dir: Optional[str] = None,
+    cache_size: int = DEFAULT_CACHE_SIZE,
+    list_cache_size: Optional[int] = None,
+    max_cached_entries: Optional[int] = None,
+    max_cached_bytes: Optional[int] = None,
+    weak_cache: bool = False,
+    hooks: SequenceType[Hook] = (),
+    stats: bool = False,
+    record_profile: bool = False,
+    prefetch_profile: Optional[str] = None
 ) -> Config:
     """ build Config from environment variables
 
@@ -25,6 +43,15 @@ def from_env(
         custom_extension_loader (Dict[str, Callable[[TextIOWrapper], Union[dict, list]]], optional): 
                 a dictionary of file extensions and loader functions
                 overriding the default loaders. E.g. {'yml': yaml.safe_load}. Defaults to {}.
+        cache_dir (str, optional): directory to persist parsed files in, see from_path.
+                Defaults to None (no persistent cache).
+        cache_size (int, optional): maximal size of cache_dir in bytes. Defaults to 64MiB.
+        list_cache_size (int, optional): number of elements a LazyList keeps, see from_path.
+                Defaults to None (unbounded).
+        max_cached_entries, max_cached_bytes, weak_cache: limits of LazyMode.BOUNDED,
+                see from_path.
+        hooks, stats: instrumentation, see from_path.
+        record_profile, prefetch_profile: learned prefetching, see from_path.
 
     Returns:
         lazyConfig.Config 
@@ -39,13 +66,33 @@ def from_env(
         config= os.environ[config],
         override= override_list,
         laziness= laziness,
-        custom_extension_loader= custom_extension_loader
+        custom_extension_loader= custom_extension_loader,
+        cache_dir= cache_dir,
+        cache_size= cache_size,
+        list_cache_size= list_cache_size,
+        max_cached_entries= max_cached_entries,
+        max_cached_bytes= max_cached_bytes,
+        weak_cache= weak_cache,
+        hooks= hooks,
+        stats= stats,
+        record_profile= record_profile,
+        prefetch_profile= prefetch_profile
     )
 
 def from_path(
     config: str, override: List[str] = [],
     laziness: LazyMode = LazyMode.CACHED,
-    custom_extension_loader: Dict[str, Callable[[TextIOWrapper], Union[dict, list]]] = {}
+    custom_extension_loader: Dict[str, Callable[[TextIOWrapper], Union[dict, list]]] = {},
+    cache_dir: Optional[str] = None,
+    cache_size: int = DEFAULT_CACHE_SIZE,
+    list_cache_size: Optional[int] = None,
+    max_cached_entries: Optional[int] = None,
+    max_cached_bytes: Optional[int] = None,
+    weak_cache: bool = False,
+    hooks: SequenceType[Hook] = (),
+    stats: bool = False,
+    record_profile: bool = False,
+    prefetch_profile: Optional[str] = None
 ) -> Config:
     """build Config from path to configuration directories
 
@@ -57,17 +104,158 @@ def from_path(
         custom_extension_loader (Dict[str, Callable[[TextIOWrapper], Union[dict, list]]], optional): 
                 a dictionary of file extensions and loader functions
                 overriding the default loaders. E.g. {'yml': yaml.safe_load}. Defaults to {}.
+        cache_dir (str, optional): directory in which parsed files are persisted
+                (pickled), so that the next process start does not need to parse
+                unchanged files again. Defaults to None (no persistent cache).
+        cache_size (int, optional): maximal size of cache_dir in bytes, the oldest
+                entries are deleted beyond that. Defaults to 64MiB.
+        list_cache_size (int, optional): in LazyMode.CACHED a LazyList (list directory)
+                only keeps this many recently used elements. Defaults to None (unbounded).
+        max_cached_entries (int, optional): in LazyMode.BOUNDED the number of files whose
+                contents are kept, least recently used first out. Defaults to None
+                (128 if max_cached_bytes is None as well).
+        max_cached_bytes (int, optional): in LazyMode.BOUNDED the estimated size of the
+                file contents which are kept. Defaults to None.
+        weak_cache (bool, optional): in LazyMode.BOUNDED evicted file contents which
+                are still referenced elsewhere are found again without reloading.
+                Defaults to False.
+        hooks (Sequence[Callable], optional): called with the events of loading and
+                accessing the configuration, see lazyConfig.stats. Defaults to ().
+        stats (bool, optional): aggregate the events for Config.stats(). Defaults to False.
+        record_profile (bool, optional): record the accessed keys for
+                Config.save_profile(). Defaults to False.
+        prefetch_profile (str, optional): profile written by Config.save_profile(),
+                its keys are loaded in a background thread. Defaults to None.
 
     Returns:
         lazyConfig.Config
     """
+    parse_cache = ParseCache(cache_dir, cache_size) if cache_dir else None
+    if record_profile:
+        hooks = tuple(hooks) + (AccessProfile(),)
+    result = _build(
+        [(path, FILE_STORAGE) for path in [config, *override]], laziness,
+        custom_extension_loader, parse_cache, list_cache_size, max_cached_entries,
+        max_cached_bytes, weak_cache, hooks, stats
+    )
+    if prefetch_profile:
+        prefetch(result, prefetch_profile)
+    return result
+
+def from_archive(
+    archive: str, overrides: List[str] = [],
+    laziness: LazyMode = LazyMode.CACHED,
+    custom_extension_loader: Dict[str, Callable[[TextIOWrapper], Union[dict, list]]] = {},
+    list_cache_size: Optional[int] = None,
+    max_cached_entries: Optional[int] = None,
+    max_cached_bytes: Optional[int] = None,
+    weak_cache: bool = False,
+    hooks: SequenceType[Hook] = (),
+    stats: bool = False
+) -> Config:
+    """build Config from a configuration tree packed into a zip archive
+
+    The root of the archive is the root of the configuration, e.g. created with
+    `cd config && zip -r ../config.zip .`. Its index is read once, files are
+    still only decompressed and parsed when their keys are accessed.
+
+    Args:
+        archive (str): path to the zip archive of the (default) configuration
+        overrides (List[str], optional): zip archives or directories overriding the
+                configuration. Defaults to [].
+        laziness, custom_extension_loader, list_cache_size, max_cached_entries,
+        max_cached_bytes, weak_cache, hooks, stats: see from_path. There is no
+                parse cache, the archive replaces the files it would cache.
+
+    Returns:
+        lazyConfig.Config
+    """
+    layers = [('', ZipStorage(archive))] # the root of an archive is ''
+    for path in overrides:
+        layers.append(('', ZipStorage(path)) if zipfile.is_zipfile(path) else (path, FILE_STORAGE))
+    return _build(
+        layers, laziness, custom_extension_loader, None, list_cache_size,
+        max_cached_entries, max_cached_bytes, weak_cache, hooks, stats
+    )
+
+def from_kv(
+    url: str, config: str = 'config', overrides: List[str] = [],
+    laziness: LazyMode = LazyMode.CACHED,
+    custom_extension_loader: Dict[str, Callable[[TextIOWrapper], Union[dict, list]]] = {},
+    list_cache_size: Optional[int] = None,
+    max_cached_entries: Optional[int] = None,
+    max_cached_bytes: Optional[int] = None,
+    weak_cache: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    pool_size: int = DEFAULT_POOL_SIZE,
+    timeout: float = 10.0,
+    token: Optional[str] = None,
+    hooks: SequenceType[Hook] = (),
+    stats: bool = False
+) -> Config:
+    """build Config from configuration trees stored in a Consul style key-value service
+
+    The keys are the paths of the files, e.g. 'config/database/connection.yml'
+    with the content of the file as value, see lazyConfig.kvStorage.
+
+    Args:
+        url (str): of the service, e.g. 'http://127.0.0.1:8500'
+        config (str, optional): key prefix of the (default) configuration. Defaults to 'config'.
+        overrides (List[str], optional): key prefixes of the configurations overriding
+                it. Defaults to [].
+        laziness, custom_extension_loader, list_cache_size, max_cached_entries,
+        max_cached_bytes, weak_cache, hooks, stats: see from_path
+        batch_size, pool_size, timeout, token: see KVStorage
+
+    Returns:
+        lazyConfig.Config
+    """
+    storage = KVStorage(url, batch_size, pool_size, timeout, token)
+    return _build(
+        [(prefix.strip('/'), storage) for prefix in [config, *overrides]], laziness,
+        custom_extension_loader, None, list_cache_size, max_cached_entries,
+        max_cached_bytes, weak_cache, hooks, stats
+    )
+
+def _build(
+    layers: List[Tuple[str, FileStorage]], laziness: LazyMode,
+    custom_extension_loader: dict, parse_cache: Optional[ParseCache],
+    list_cache_size: Optional[int], max_cached_entries: Optional[int],
+    max_cached_bytes: Optional[int], weak_cache: bool, hooks: SequenceType[Hook], stats: bool
+) -> Config:
+    """ Config of the (path, storage) layers, the first one is the default configuration """
     ext_map = DEFAULT_EXTENSION_MAP.copy()
     ext_map.update(custom_extension_loader)
     extension_loader = {key:value for key, value in ext_map.items() if value}
-    return(Config(
-        config = LazyDict(config, laziness=laziness, extension_map=extension_loader),
-        override = [LazyDict(x, laziness, extension_loader) for x in override]
-    ))
+    bounded_cache = None
+    if laziness == LazyMode.BOUNDED:
+        if not (max_cached_entries or max_cached_bytes):
+            max_cached_entries = DEFAULT_BOUNDED_ENTRIES
+        bounded_cache = LRUCache(max_cached_entries, max_cached_bytes, weak_cache)
+    hooks = tuple(hooks) + ((Stats(),) if stats else ())
+    options = {} # storage -> options shared by its layers
+    trees = []
+    for path, storage in layers:
+        if storage not in options:
+            options[storage] = _TreeOptions(
+                extension_loader, parse_cache if storage is FILE_STORAGE else None,
+                list_cache_size, bounded_cache, hooks, storage
+            )
+        trees.append(LazyDict(path, laziness, options=options[storage]))
+    result = Config(config = trees[0], override = trees[1:])
+    result._hooks = hooks
+    return result
+
+async def afrom_path(*args, **kwargs) -> Config:
+    """ from_path without blocking the event loop
+
+    The directory scan and keyfile of the default configuration and of every
+    override are read in the default executor. Accepts the same arguments as
+    from_path. Use `await config.aget(key)` for further non blocking access.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        None, functools.partial(from_path, *args, **kwargs)
+    )
 
 def from_primitive(
     config: Union[Mapping, Sequence], 
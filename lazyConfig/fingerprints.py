@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+""" content fingerprints: compare configurations without loading unchanged subtrees
+
+A fingerprint is a short digest of the content of a node. Files are hashed as
+they are stored (read, not parsed) together with the loader parsing them,
+directories combine the fingerprints of their entries and a Config those of
+its layers. Files which changed since they were loaded are fingerprinted by
+the loaded value instead, that is what the Config returns until refresh().
+LazyDicts and LazyLists keep the fingerprints of their entries until refresh()
+finds changes (in LazyMode.LAZY nothing is kept), so comparing unchanged
+subtrees again only compares digests.
+
+Overrides added to a child Config (elements of lists included) are recorded
+at its root and covered by the fingerprint of the root. Elements of lists
+without a root Config (e.g. from_primitive of a list) are not: once an override
+was added to one of them, comparisons below the list do not use fingerprints.
+
+Loaders without an identity shared by all processes (see parsers.loader_key)
+only match themselves. Equal fingerprints imply equal content. The converse does not hold: the same
+values stored differently (e.g. in another file format, in the keyfile instead
+of a file of their own, or split differently across the layers) have different
+fingerprints and are compared value by value.
+"""
+
+from typing import Iterator, Tuple, Union
+from collections.abc import Sequence, Mapping
+from hashlib import blake2b
+import mmap
+
+from .lazyData import LazyDict, LazyList, PackedList, LazyMode
+from .config import Config, ConfigList, _OVERLAYS
+from .compiled import PATH_SEP
+from .parsers import loader_key
+
+DIGEST_SIZE = 16 # bytes
+_ALL = object() # key of the fingerprint of the whole LazyDict in its memo
+
+
+class _Missing:
+    def __repr__(self):
+        return 'MISSING'
+
+MISSING = _Missing() # stands for the value of a key which only exists on one side of a diff
+
+
+def fingerprint(value) -> bytes:
+    """ digest of the content of a (lazy) configuration node or primitive value
+
+    overlays are not taken into account, the fingerprint of a Config covers its layers.
+    """
+    if isinstance(value, Config):
+        if value._fingerprint is not None:
+            return value._fingerprint
+        digest = _hash(b'c', fingerprint(value._config), *map(fingerprint, value._override))
+        if value._cacheable:
+            value._fingerprint = digest
+        return digest
+    if isinstance(value, ConfigList):
+        return fingerprint(value.list)
+    if isinstance(value, LazyDict):
+        return _dict_fingerprint(value)
+    if isinstance(value, LazyList):
+        return _list_fingerprint(value)
+    if isinstance(value, Mapping):
+        return _hash(b'd', *sorted(
+            fingerprint(key) + fingerprint(item) for key, item in value.items()))
+    if isinstance(value, Sequence) and not isinstance(value, (str, bytes)):
+        return _hash(b'l', *map(fingerprint, value))
+    return _hash(type(value).__name__.encode(), repr(value).encode())
+
+def diff(
+    config: Union[Config, ConfigList], other: Union[Config, ConfigList]
+) -> dict:
+    """ the leaves which differ between config and other, subtrees with equal
+    fingerprints are skipped without loading them
+
+    Returns:
+        dict: dotted path -> (value in config, value in other), a key which only
+            exists on one side has the value MISSING on the other
+    """
+    return {
+        PATH_SEP.join(map(str, path)): (value, other_value)
+        for path, value, other_value in _differences(config, other, (), _shortcut(config, other))
+    }
+
+def equal(config: Config, other: Config) -> bool:
+    """ whether the merged configurations are equal, see diff """
+    return next(_differences(config, other, (), _shortcut(config, other)), None) is None
+
+def modified(node) -> bool:
+    """ whether an override was added to an element of a list below node, its
+    fingerprint does not cover that (only memoized nodes are visited)
+    """
+    if isinstance(node, ConfigList):
+        return any(
+            (isinstance(value, Config) and bool(value._override)) or modified(value)
+            for value in node._cache.values()
+        )
+    if isinstance(node, Config):
+        return any(modified(value) for value in node._cache.values())
+    return False
+
+def _shortcut(a, b) -> bool:
+    """ whether equal fingerprints of a and b (and their children) imply equal values """
+    # overlays change values without changing the fingerprints
+    return not _OVERLAYS.get() and not modified(a) and not modified(b)
+
+def _differences(a, b, path: tuple, shortcut: bool) -> Iterator[Tuple[tuple, object, object]]:
+    """ yield (path, value in a, value in b) of the differing leaves """
+    if isinstance(a, Config) and isinstance(b, Config):
+        if shortcut and fingerprint(a) == fingerprint(b):
+            return
+        for key in a:
+            if key not in b._config:
+                yield path + (key,), a[key], MISSING
+            elif not shortcut or _member_fingerprint(a, key) != _member_fingerprint(b, key):
+                yield from _differences(a[key], b[key], path + (key,), shortcut)
+        for key in b:
+            if key not in a._config:
+                yield path + (key,), MISSING, b[key]
+    elif isinstance(a, ConfigList) and isinstance(b, ConfigList):
+        if shortcut and isinstance(a.list, LazyList) and fingerprint(a) == fingerprint(b):
+            return
+        for idx in range(max(len(a), len(b))):
+            if idx >= len(a):
+                yield path + (idx,), MISSING, b[idx]
+            elif idx >= len(b):
+                yield path + (idx,), a[idx], MISSING
+            else:
+                yield from _differences(a[idx], b[idx], path + (idx,), shortcut)
+    elif a != b:
+        yield path, a, b
+
+def _member_fingerprint(config: Config, key) -> bytes:
+    """ fingerprint(config[key]) of an existing key without resolving it """
+    layers = [config._config, *(layer for layer in config._override if key in layer)]
+    return _hash(b'c', *(_entry_fingerprint(layer, key) for layer in layers))
+
+def _entry_fingerprint(mapping: Mapping, key) -> bytes:
+    if not isinstance(mapping, LazyDict):
+        return fingerprint(mapping[key])
+    if mapping._digests is not None:
+        try:
+            return mapping._digests[key][1]
+        except KeyError:
+            pass
+    signature = None # of the hashed file, refresh() compares it
+    extension = None if key in mapping._raw_keys else mapping._manifest.entries[key]
+    if key in mapping._raw_keys:
+        digest = fingerprint(mapping._entries[key])
+    elif extension is None: # directory, only scanned
+        digest = fingerprint(mapping[key])
+    else:
+        storage = mapping._options.storage
+        path = storage.join(mapping.path, key + extension)
+        signature = storage.signature(path)
+        loaded = mapping._file_stats.get(key)
+        if loaded is not None and loaded != signature: # changed since it was loaded
+            signature = loaded # so that refresh() drops the digest with the value
+            digest = fingerprint(mapping[key])
+        else:
+            digest = _file_digest(
+                storage, path, extension, mapping._options.extension_map[extension])
+    if mapping._laziness != LazyMode.LAZY:
+        if mapping._digests is None:
+            mapping._digests = {}
+        mapping._digests[key] = (signature, digest)
+    return digest
+
+def _dict_fingerprint(lazy_dict: LazyDict) -> bytes:
+    if lazy_dict._digests is not None and _ALL in lazy_dict._digests:
+        return lazy_dict._digests[_ALL][1]
+    digest = _hash(b'd', *sorted(
+        fingerprint(key) + _entry_fingerprint(lazy_dict, key) for key in lazy_dict._entries))
+    if lazy_dict._laziness != LazyMode.LAZY:
+        if lazy_dict._digests is None:
+            lazy_dict._digests = {}
+        lazy_dict._digests[_ALL] = (None, digest)
+    return digest
+
+def _list_fingerprint(lazy_list: LazyList) -> bytes:
+    if lazy_list._digest is not None:
+        return lazy_list._digest[1]
+    storage = lazy_list._storage
+    if isinstance(lazy_list, PackedList): # a single file
+        signatures = (storage.signature(lazy_list.path),)
+        if signatures[0] != lazy_list._signature: # changed since it was opened
+            signatures = (lazy_list._signature,) # so that refresh() drops the digest
+            digest = _hash(b'l', *(fingerprint(value) for value in lazy_list))
+        else:
+            digest = _file_digest(storage, lazy_list.path, lazy_list.extension, lazy_list.loader)
+    else:
+        signatures, digests = [], []
+        for idx in range(lazy_list.length):
+            path = storage.join(lazy_list.path, f"{idx}" + lazy_list.extension)
+            signature = storage.signature(path)
+            loaded = lazy_list._stats.get(idx)
+            if loaded is not None and loaded != signature: # changed since it was loaded
+                signatures.append(loaded)
+                digests.append(fingerprint(lazy_list[idx]))
+            else:
+                signatures.append(signature)
+                digests.append(_file_digest(storage, path, lazy_list.extension, lazy_list.loader))
+        signatures = tuple(signatures)
+        digest = _hash(b'l', *digests)
+    if lazy_list._laziness != LazyMode.LAZY:
+        lazy_list._digest = (signatures, digest)
+    return digest
+
+def _file_digest(storage, path: str, extension: str, loader) -> bytes:
+    contents = storage.map(path)
+    try:
+        return _hash(b'f', extension.encode(), b'\0', _loader_identity(loader), b'\0',
+                     contents or b'')
+    finally:
+        if isinstance(contents, mmap.mmap):
+            contents.close()
+
+def _loader_identity(loader) -> bytes:
+    """ the same file parsed by different loaders is different content """
+    key = loader_key(loader)
+    return key.encode() if key is not None else f"id:{id(loader)}".encode()
+
+def _hash(*parts: bytes) -> bytes:
+    digest = blake2b(digest_size=DIGEST_SIZE)
+    for part in parts:
+        digest.update(part)
+    return digest.digest()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+""" configuration trees stored in a key-value service with a Consul style HTTP API
+
+The keys of a tree are its paths, e.g. 'config/database/connection.yml' (the
+value is the content of the file). Used endpoints:
+
+- GET /v1/kv/<prefix>/?keys&separator=/ lists a directory, the X-Consul-Index
+  header (the highest modify index below the prefix) acts as its mtime
+- PUT /v1/txn with up to `batch_size` get operations reads several keys at once
+- GET /v1/kv/<key> reads a single key (only if a transaction failed)
+
+One request per key would make every lazy lookup a round trip. Instead the
+values are kept in a local response cache and read in batches: opening a file
+fetches its unread siblings (the files of the same directory) with it, and
+prefetch() reads a set of files in as few transactions as possible.
+Connections are kept alive and reused from a pool.
+"""
+
+from typing import Iterable, List, Optional, Tuple, TextIO
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlsplit, quote
+import io, json, base64, queue, threading, posixpath, http.client
+
+from .storage import DirManifest, _manifest
+
+DEFAULT_BATCH_SIZE = 64 # operations per transaction (the limit of Consul)
+DEFAULT_POOL_SIZE = 4
+
+
+class KVStorage:
+    """ read only tree in a key-value service, paths are keys without leading '/'
+
+    Args:
+        url (str): of the service, e.g. 'http://127.0.0.1:8500'
+        batch_size (int, optional): keys read per request. Defaults to 64.
+        pool_size (int, optional): connections kept open, also the number of
+            concurrent requests of prefetch(). Defaults to 4.
+        timeout (float, optional): seconds per request. Defaults to 10.
+        token (str, optional): sent as X-Consul-Token. Defaults to None.
+    """
+    join = staticmethod(posixpath.join)
+
+    def __init__(
+        self, url: str, batch_size: int = DEFAULT_BATCH_SIZE,
+        pool_size: int = DEFAULT_POOL_SIZE, timeout: float = 10.0,
+        token: Optional[str] = None
+    ):
+        parts = urlsplit(url)
+        assert parts.scheme in ('http', 'https'), f'unsupported url {url}'
+        self.url = url
+        self.batch_size = batch_size
+        self._connection_class = (
+            http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection)
+        self._netloc = parts.netloc
+        self._base = parts.path.rstrip('/') + '/v1'
+        self._timeout = timeout
+        self._headers = {'X-Consul-Token': token} if token else {}
+        self._pool = queue.LifoQueue(pool_size)
+        self._pool_size = pool_size
+        self._lock = threading.Lock()
+        self._responses = {} # key -> (modify index, value), the local response cache
+        self._listings = {} # directory -> keys of its files at the last scan
+        self._indexes = {} # directory -> index of its last listing
+
+    def scan(self, path: str, extensions) -> DirManifest:
+        index, keys = self._list(path)
+        prefix = path + '/' if path else ''
+        listing = {}
+        for key in keys:
+            name = key[len(prefix):]
+            if name.endswith('/'):
+                listing[name[:-1]] = True
+            elif name:
+                listing[name] = False
+        listing.pop('', None)
+        with self._lock:
+            self._listings[path] = [prefix + name for name, is_dir in listing.items() if not is_dir]
+            self._indexes[path] = index
+        return _manifest(listing.items(), extensions, index)
+
+    def open(self, path: str) -> TextIO:
+        return io.TextIOWrapper(io.BytesIO(self._value(path)), encoding='utf-8')
+
+    def map(self, path: str):
+        """ contents of the file (kept in the response cache) """
+        return self._value(path) or None
+
+    def mtime(self, path: str) -> int:
+        """ index of the directory, drops the cached files of the directory if it changed """
+        index, _ = self._list(path)
+        with self._lock:
+            if self._indexes.get(path) != index:
+                self._indexes[path] = index
+                for key in self._listings.get(path, ()):
+                    self._responses.pop(key, None)
+        return index
+
+    def signature(self, path: str) -> Optional[Tuple[int, int]]:
+        """ (modify index, size) of the file, None if it does not exist """
+        try:
+            index, value = self._response(path)
+        except FileNotFoundError:
+            return None
+        return (index, len(value))
+
+    def opened_signature(self, stream: TextIO, path: str) -> Optional[Tuple[int, int]]:
+        """ signature of the response the stream was opened from (cached) """
+        return self.signature(path)
+
+    def prefetch(self, paths: Iterable[str]):
+        """ read the files which are not cached yet with as few requests as possible,
+        batches are sent concurrently over the pooled connections
+        """
+        with self._lock:
+            missing = list(dict.fromkeys(path for path in paths if path not in self._responses))
+        batches = [missing[start:start + self.batch_size]
+                   for start in range(0, len(missing), self.batch_size)]
+        if len(batches) > 1:
+            with ThreadPoolExecutor(min(len(batches), self._pool_size)) as pool:
+                for _ in pool.map(self._fetch, batches):
+                    pass
+        elif batches:
+            self._fetch(batches[0])
+
+    def clear(self):
+        """ drop the response cache """
+        with self._lock:
+            self._responses.clear()
+
+    def close(self):
+        """ close the pooled connections """
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _value(self, path: str) -> bytes:
+        return self._response(path)[1]
+
+    def _response(self, path: str) -> Tuple[int, bytes]:
+        """ (modify index, value) of the key, fetched with its siblings on a cache miss """
+        try:
+            return self._responses[path]
+        except KeyError:
+            pass
+        self._fetch(self._batch(path))
+        try:
+            return self._responses[path]
+        except KeyError:
+            raise FileNotFoundError(f'{path} does not exist in {self.url}') from None
+
+    def _batch(self, path: str) -> List[str]:
+        """ path and the unread files of its directory """
+        batch = [path]
+        with self._lock:
+            for key in self._listings.get(posixpath.dirname(path), ()):
+                if len(batch) >= self.batch_size:
+                    break
+                if key != path and key not in self._responses:
+                    batch.append(key)
+        return batch
+
+    def _fetch(self, keys: List[str]):
+        """ read the keys in one transaction (individually if it failed,
+        e.g. because a key was deleted since the directory was listed)
+        """
+        operations = [{'KV': {'Verb': 'get', 'Key': key}} for key in keys]
+        status, _, body = self._request('PUT', '/txn', json.dumps(operations).encode())
+        if status == 200:
+            entries = [result['KV'] for result in json.loads(body)['Results']]
+        else:
+            entries = []
+            for key in keys:
+                status, _, body = self._request('GET', '/kv/' + quote(key))
+                if status == 200:
+                    entries += json.loads(body)
+                elif status != 404:
+                    raise OSError(f'{self.url} responded {status} for {key}')
+        with self._lock:
+            for entry in entries:
+                value = base64.b64decode(entry['Value']) if entry.get('Value') else b''
+                self._responses[entry['Key']] = (entry['ModifyIndex'], value)
+
+    def _list(self, path: str) -> Tuple[int, List[str]]:
+        """ (index, keys) of the directory """
+        prefix = quote(path + '/') if path else ''
+        status, headers, body = self._request('GET', f'/kv/{prefix}?keys&separator=/')
+        if status == 404:
+            raise FileNotFoundError(f'{path} is not a directory in {self.url}')
+        if status != 200:
+            raise OSError(f'{self.url} responded {status} listing {path}')
+        return int(headers.get('X-Consul-Index', 0)), json.loads(body)
+
+    def _request(self, method: str, url: str, body: Optional[bytes] = None):
+        """ (status, headers, body) of the response, retried once on a closed connection """
+        for attempt in range(2):
+            try:
+                with self._connection() as connection:
+                    connection.request(method, self._base + url, body, self._headers)
+                    response = connection.getresponse()
+                    return response.status, response.headers, response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                if attempt: # the connection from the pool was closed by the server
+                    raise
+
+    @contextmanager
+    def _connection(self):
+        try:
+            connection = self._pool.get_nowait()
+        except queue.Empty:
+            connection = self._connection_class(self._netloc, timeout=self._timeout)
+        try:
+            yield connection
+        except BaseException:
+            connection.close()
+            raise
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def __repr__(self):
+        return f"KVStorage(url='{self.url}')"
@@ -5,56 +5,312 @@ from collections.abc import Sequence, Mapping
 
 from enum import Enum
 
-import os
-import json, yaml, toml
-
-DEFAULT_EXTENSION_MAP = {
-    '.yml': yaml.unsafe_load,
-    '.yaml': yaml.unsafe_load,
-    '.json': json.load,
-    '.toml': toml.load
-}
+import os, sys, json, time, asyncio
+from array import array
+from weakref import WeakValueDictionary
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from .parseCache import ParseCache
+from .parsers import DEFAULT_EXTENSION_MAP
+from .partialJson import JSONView, JSONListView
+from .stats import emit
+from .storage import DirManifest, FileStorage, FILE_STORAGE, scan_dir, stat_signature
 
 KEYFILE = '__config__'
+DEFAULT_BOUNDED_ENTRIES = 128
+PACKED_LIST_EXTENSION = '.jsonl' # a PackedList instead of a file parsed as a whole
+LINE_INDEX_CHUNK = 2**24 # bytes
 
 
 class LazyMode(Enum):
     EAGER = 0
     CACHED = 1
     LAZY = 2
+    BOUNDED = 3
+
+class _WeakDict(dict):
+    """ dict which can be weakly referenced """
+    __slots__ = ('__weakref__',)
+
+class _WeakList(list):
+    """ list which can be weakly referenced """
+    __slots__ = ('__weakref__',)
+
+
+def estimate_size(obj) -> int:
+    """ rough recursive memory estimate of parsed file contents in bytes, lazy data
+    only counts itself since its contents are accounted for by their own caches
+    """
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(estimate_size(key) + estimate_size(value) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(estimate_size(value) for value in obj)
+    return size
+
+
+class LRUCache:
+    """ dictionary dropping the least recently used entries beyond max_entries
+    entries or beyond max_bytes (see estimate_size) of values
+
+    With `weak=True` evicted values are only weakly referenced, so values still
+    referenced elsewhere are found again instead of being loaded a second time.
+    """
+    __slots__ = ('max_entries', 'max_bytes', 'weak', '_data', '_bytes', '_evicted')
+
+    def __init__(
+        self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+        weak: bool = False
+    ):
+        assert max_entries or max_bytes, 'an LRUCache needs max_entries or max_bytes'
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.weak = weak
+        self._data = OrderedDict() # key -> (value, estimated size)
+        self._bytes = 0
+        self._evicted = WeakValueDictionary() if weak else None
+
+    def __getitem__(self, key):
+        try:
+            value, _ = self._data[key]
+        except KeyError:
+            if self._evicted is None or (value := self._evicted.get(key)) is None:
+                raise
+            self[key] = value # still in use, revive
+            return value
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.pop(key)
+        size = estimate_size(value) if self.max_bytes else 0
+        self._data[key] = (value, size)
+        self._bytes += size
+        while self._data and (
+            (self.max_entries and len(self._data) > self.max_entries)
+            or (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            evicted_key, (evicted, evicted_size) = self._data.popitem(last=False)
+            self._bytes -= evicted_size
+            if self._evicted is not None:
+                try:
+                    self._evicted[evicted_key] = evicted
+                except TypeError: # not weakly referencable
+                    pass
+
+    def add(self, key, value):
+        """ store the value and return the object callers should use, in weak mode
+        dicts and lists are copied once into weakly referencable subclasses
+        """
+        if self.weak:
+            if type(value) is dict:
+                value = _WeakDict(value)
+            elif type(value) is list:
+                value = _WeakList(value)
+        self[key] = value
+        return value
+
+    def pop(self, key, default=None):
+        """ remove the key if present and return its value """
+        if self._evicted is not None:
+            self._evicted.pop(key, None)
+        try:
+            value, size = self._data.pop(key)
+        except KeyError:
+            return default
+        self._bytes -= size
+        return value
+
+    def view(self, prefix) -> '_LRUView':
+        """ the entries with keys (prefix, key), to share one cache between nodes """
+        return _LRUView(self, prefix)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def update(self, other: dict):
+        for key, value in other.items():
+            self[key] = value
+
+    def __repr__(self):
+        return (f"LRUCache(max_entries={self.max_entries}, max_bytes={self.max_bytes}, "
+                f"entries={len(self._data)}, bytes={self._bytes})")
+
+class _LRUView:
+    """ prefixed access to a (shared) LRUCache """
+    __slots__ = ('_lru', '_prefix')
+
+    def __init__(self, lru: LRUCache, prefix):
+        self._lru = lru
+        self._prefix = prefix
+
+    def __getitem__(self, key):
+        return self._lru[(self._prefix, key)]
+
+    def __setitem__(self, key, value):
+        self._lru[(self._prefix, key)] = value
+
+    def add(self, key, value):
+        return self._lru.add((self._prefix, key), value)
+
+    def pop(self, key, default=None):
+        return self._lru.pop((self._prefix, key), default)
+
+    def __contains__(self, key):
+        return (self._prefix, key) in self._lru
+
 
 class LazyList(Sequence):
     """ a pointer to a directory containing <0,1,...>.<json, yaml,...> files
     emulating a list
+
+    like LazyDict loaded elements are kept (LazyMode.CACHED), loaded on
+    construction (LazyMode.EAGER), loaded on every access (LazyMode.LAZY) or
+    kept in the LRUCache `bounded_cache` shared with the tree (LazyMode.BOUNDED).
+    With `max_cached` a CACHED list only keeps the most recently used elements.
     """
+    __slots__ = (
+        'path', 'length', 'extension', 'loader', '_laziness', '_parse_cache',
+        '_manifest', '_stats', '_max_cached', '_cache', '_hooks', '_storage', '_digest'
+    )
+
     def __init__(
         self, path, length, extension, loader: Callable,
-        laziness: LazyMode = LazyMode.CACHED
+        laziness: LazyMode = LazyMode.CACHED,
+        parse_cache: Optional[ParseCache] = None,
+        max_cached: Optional[int] = None,
+        bounded_cache: Optional[LRUCache] = None,
+        manifest: Optional[DirManifest] = None,
+        hooks: tuple = (),
+        storage: FileStorage = FILE_STORAGE
     ):
         # assert os.path.isdir(path), 'can only generate LazyList from valid directory'
         self.path = path
         self.length = length
         self.extension = extension
         self.loader = loader
+        self._laziness = laziness
+        self._parse_cache = parse_cache
+        self._manifest = manifest
+        self._hooks = hooks
+        self._storage = storage
+        self._digest = None # (signatures of the files, fingerprint), see lazyConfig.fingerprints
+        self._stats = {} # idx -> signature of the element file when it was loaded
+        self._max_cached = max_cached if laziness == LazyMode.CACHED else None
+        self._cache = LRUCache(max_cached) if self._max_cached else {}
+        if laziness == LazyMode.BOUNDED:
+            # the storage tells apart layers with the same paths (e.g. archives)
+            self._cache = (bounded_cache or LRUCache(DEFAULT_BOUNDED_ENTRIES)).view((storage, path))
+
+        if self._laziness == LazyMode.EAGER:
+            self.force_load()
 
     def __getitem__(self, key: [int, tuple, slice]):
         #TODO: allow for directories
         if isinstance(key, int):
-            if 0 > key > -self.length:
-                key = self.length + key
+            key = self._index(key)
+            if self._hooks:
+                emit(self._hooks, 'lookup', path=self.path, key=key, hit=key in self._cache)
             try:
-                return load(
-                    os.path.join(self.path, f"{key}" + self.extension),
-                    self.loader
-                )
-            except FileNotFoundError:
-                raise IndexError(f'lazyList index {key} out of range') from None
+                return self._cache[key]
+            except KeyError:
+                pass
+            return self._store(key, self._load(key))
         elif isinstance(key, tuple):
-            return [self[x] for x in key] #TODO: performance?
+            return self._get_many([self._index(x) for x in key])
         elif isinstance(key, slice):
-            return [self[x] for x in range(self.length)[key]]
+            return self._get_many(range(self.length)[key])
         raise TypeError(f'Index must be int, tuple or slice, not {type(key).__name__}')
 
+    def _peek(self, idx: int):
+        """ self[idx] without keeping a newly loaded element """
+        idx = self._index(idx)
+        try:
+            return self._cache[idx]
+        except KeyError:
+            return self._load(idx, record=False)
+
+    def _index(self, key: int) -> int:
+        if -self.length <= key < 0:
+            key = self.length + key
+        if not 0 <= key < self.length:
+            raise IndexError(f'lazyList index {key} out of range')
+        return key
+
+    def _get_many(self, indices) -> list:
+        """ load all missing elements in one pass, then assemble the list """
+        values = {}
+        for idx in indices:
+            if idx not in values:
+                try:
+                    values[idx] = self._cache[idx]
+                except KeyError:
+                    values[idx] = self._store(idx, self._load(idx))
+        return [values[idx] for idx in indices]
+
+    def _store(self, idx: int, value):
+        """ keep the loaded element according to the laziness """
+        if self._laziness == LazyMode.LAZY:
+            return value
+        if isinstance(self._cache, dict):
+            self._cache[idx] = value
+            return value
+        return self._cache.add(idx, value)
+
+    def _load(self, idx: int, record: bool = True):
+        """ read and parse the element at the (non-negative) index """
+        path = self._storage.join(self.path, f"{idx}" + self.extension)
+        record = record and self._laziness != LazyMode.LAZY
+        try:
+            value, signature = load_signed(
+                path, self.loader, self._parse_cache, self._hooks, self._storage, record)
+        except FileNotFoundError:
+            raise IndexError(f'lazyList index {idx} out of range') from None
+        if record:
+            self._stats[idx] = signature
+            if self._digest is not None and self._digest[0][idx] != signature:
+                self._digest = None # of other contents, see lazyConfig.fingerprints
+        return value
+
+    def refresh(self) -> bool:
+        """ forget elements whose files changed since they were loaded
+
+        a changed number of elements is detected by the LazyDict containing
+        this list, which replaces it.
+
+        Returns:
+            bool: whether any element changed
+        """
+        changed = False
+        for idx, signature in list(self._stats.items()):
+            if self._storage.signature(
+                self._storage.join(self.path, f"{idx}" + self.extension)) != signature:
+                changed = True
+                del self._stats[idx]
+                self._cache.pop(idx, None)
+        if self._digest is not None and self._digest[0] != tuple(
+            self._storage.signature(self._storage.join(self.path, f"{idx}" + self.extension))
+            for idx in range(self.length)
+        ):
+            changed = True
+        if changed:
+            self._digest = None
+        if changed and self._laziness == LazyMode.EAGER:
+            self.force_load()
+        return changed
+
+    def force_load(self):
+        """ load and keep all elements """
+        self._laziness = LazyMode.EAGER
+        self._max_cached = None
+        cache = self._cache
+        self._cache = {idx: cache[idx] if idx in cache else self._load(idx)
+                       for idx in range(self.length)}
+
     def __len__(self):
         return self.length
 
@@ -69,6 +325,124 @@ class LazyList(Sequence):
         return self.as_list()
 
 
+class PackedList(LazyList):
+    """ a LazyList stored in a single JSON Lines file (one element per line)
+
+    The byte offsets of the lines are indexed once (and kept in the ParseCache
+    if there is one), elements are decoded from the memory mapped file on access.
+    Blank lines are skipped.
+    """
+    __slots__ = ('_buf', '_starts', '_ends', '_signature')
+
+    def __init__(
+        self, path: str,
+        laziness: LazyMode = LazyMode.CACHED,
+        parse_cache: Optional[ParseCache] = None,
+        max_cached: Optional[int] = None,
+        bounded_cache: Optional[LRUCache] = None,
+        hooks: tuple = (),
+        storage: FileStorage = FILE_STORAGE
+    ):
+        self._open(path, parse_cache, hooks, storage)
+        super().__init__(
+            path, len(self._starts), PACKED_LIST_EXTENSION, json.loads, laziness,
+            parse_cache, max_cached, bounded_cache, None, hooks, storage
+        )
+
+    def _open(self, path: str, parse_cache: Optional[ParseCache], hooks: tuple, storage):
+        (self._starts, self._ends), self._signature = load_signed(
+            path, line_index, parse_cache, hooks, storage)
+        self._buf = storage.map(path) if self._starts else None
+
+    def _load(self, idx: int, record: bool = True):
+        """ decode the element at the (non-negative) index """
+        return self.loader(self._buf[self._starts[idx]:self._ends[idx]])
+
+    def refresh(self) -> bool:
+        """ forget all elements if the file changed, the length is updated
+
+        Returns:
+            bool: whether the file changed
+        """
+        if self._storage.signature(self.path) == self._signature:
+            return False
+        old_length = self.length
+        self._digest = None
+        self._open(self.path, self._parse_cache, self._hooks, self._storage)
+        self.length = len(self._starts)
+        for idx in range(old_length):
+            self._cache.pop(idx, None)
+        if self._laziness == LazyMode.EAGER:
+            self.force_load()
+        return True
+
+    def __repr__(self):
+        return f"PackedList(path='{self.path}', length={self.length})"
+
+def line_index(stream) -> Tuple[array, array]:
+    """ loader returning the (start, end) byte offsets of the non blank lines """
+    starts, ends = array('q'), array('q')
+    offset = 0
+    rest = b''
+    binary = stream.buffer
+    while chunk := binary.read(LINE_INDEX_CHUNK):
+        lines = (rest + chunk).split(b'\n')
+        rest = lines.pop() # might continue in the next chunk
+        for line in lines:
+            if line.strip():
+                starts.append(offset)
+                ends.append(offset + len(line))
+            offset += len(line) + 1
+    if rest.strip():
+        starts.append(offset)
+        ends.append(offset + len(rest))
+    return starts, ends
+line_index.cache_key = 'lazyConfig.line_index' # see parsers.loader_key
+
+
+class _TreeOptions:
+    """ settings shared by all nodes of a tree instead of one copy per node """
+    __slots__ = (
+        'extension_map', 'extensions', 'parse_cache', 'list_cache_size', 'bounded_cache', 'hooks',
+        'storage'
+    )
+
+    def __init__(
+        self, extension_map: dict, parse_cache: Optional[ParseCache],
+        list_cache_size: Optional[int], bounded_cache: Optional[LRUCache],
+        hooks: tuple = (), storage: FileStorage = FILE_STORAGE
+    ):
+        self.extension_map = extension_map
+        self.extensions = extension_map.keys() # live view, no copy
+        self.parse_cache = parse_cache
+        self.list_cache_size = list_cache_size
+        self.bounded_cache = bounded_cache
+        self.hooks = hooks # see lazyConfig.stats
+        self.storage = storage # see lazyConfig.storage
+
+class _Unloaded:
+    """ placeholder of a key whose file (extension) or directory (None) is not loaded,
+    one instance per extension is shared by all nodes, see _unloaded
+    """
+    __slots__ = ('extension',)
+
+    def __init__(self, extension: Optional[str]):
+        self.extension = extension
+
+    def __repr__(self):
+        return f"_Unloaded({self.extension!r})"
+
+_UNLOADED = {}
+
+def _unloaded(extension: Optional[str]) -> _Unloaded:
+    try:
+        return _UNLOADED[extension]
+    except KeyError:
+        return _UNLOADED.setdefault(extension, _Unloaded(extension))
+
+_NO_KEYS = frozenset()
+
+
 class LazyDict(Mapping):
     """ a pointer to a directory emulating a (nested) dictionary (json-like structure)
 
@@ -76,162 +450,509 @@ class LazyDict(Mapping):
     - the contents of other files are grouped under their name as the key
     - the name of subdirectories is the key to another lazyDict with this subdirectory
     as its pointer
+
+    All keys live in a single table `_entries`, keys which are not loaded yet map
+    to a shared _Unloaded placeholder. Settings are shared by the whole tree
+    (see _TreeOptions).
     """
+    __slots__ = (
+        'path', '_laziness', '_options', '_entries', '_raw_keys', '_file_stats',
+        '_inflight', '_manifest', '_keyfile_signature', '_digests'
+    )
+
     def __init__(
         self, path: str= '',
         laziness: LazyMode = LazyMode.CACHED,
-        extension_map: dict = DEFAULT_EXTENSION_MAP
+        extension_map: dict = DEFAULT_EXTENSION_MAP,
+        parse_cache: Optional[ParseCache] = None,
+        list_cache_size: Optional[int] = None,
+        bounded_cache: Optional[LRUCache] = None,
+        manifest: Optional[DirManifest] = None,
+        options: Optional[_TreeOptions] = None
     ):
         self.path = path
         self._laziness = laziness
-        self.extension_map = extension_map
-        self._raw_dict = {}
-        self._cache_dict = {}
-        self._lazy_dict = files_in_dir_with_given_ext(
-            dir_path=self.path, extensions=self.extension_map.keys())
-        
-        try:
-            extension = self._lazy_dict.pop(KEYFILE)
-        except KeyError: # no KEYFILE
-            pass
-        else:
-            assert extension is not None, "dictionary with name __config__ is not allowed"
-            keyfile = os.path.join(self.path, KEYFILE + extension)
-            self._raw_dict = load(keyfile, self.extension_map[extension])
-            assert isinstance(self._raw_dict, dict), ("naked list in Keyfile not allowed: "
-                "use list in a lower level or a LazyList in directory")
-
-        assert not set(self._raw_dict.keys()).intersection(
-            self._lazy_dict.keys()), 'duplicate keys not allowed'
+        if options is None: # root of a tree
+            if laziness == LazyMode.BOUNDED and bounded_cache is None:
+                bounded_cache = LRUCache(DEFAULT_BOUNDED_ENTRIES)
+            options = _TreeOptions(extension_map, parse_cache, list_cache_size, bounded_cache)
+        self._options = options
+        self._entries = {}
+        self._raw_keys = _NO_KEYS # keys from the keyfile
+        self._inflight = None # key -> asyncio.Future of aget
+        self._file_stats = {} # key -> signature of the file when it was loaded
+        self._digests = None # key -> (signature of the file, fingerprint), see lazyConfig.fingerprints
+        if manifest is None:
+            manifest = self._scan(self.path)
+        self._manifest = manifest
+        self._load_keyfile()
+        for key, extension in manifest.entries.items():
+            if key != KEYFILE:
+                self._entries[key] = _unloaded(extension)
 
         if self._laziness == LazyMode.EAGER:
             self.force_load()
 
+    @property
+    def extension_map(self) -> dict:
+        return self._options.extension_map
+
+    @property
+    def _parse_cache(self) -> Optional[ParseCache]:
+        return self._options.parse_cache
+
+    @property
+    def _bounded_cache(self) -> Optional[LRUCache]:
+        return self._options.bounded_cache
+
     def __getitem__(self, key: str):
-        try:
-            return self._raw_dict[key]
-        except KeyError:
+        value = self._entries[key]
+        hooks = self._options.hooks
+        if type(value) is not _Unloaded:
+            if hooks:
+                emit(hooks, 'lookup', path=self.path, key=key, hit=True)
+            return value
+        extension = value.extension
+        if self._laziness in (LazyMode.CACHED, LazyMode.EAGER) or (
+            self._laziness == LazyMode.BOUNDED and extension is None
+        ): # a BOUNDED tree keeps its directories, only file contents are bounded
+            if hooks:
+                emit(hooks, 'lookup', path=self.path, key=key, hit=False)
+            loaded = self._fetch(key, extension, self._laziness)
+            current = self._entries.get(key, loaded)
+            if current is value:
+                self._entries[key] = current = loaded
+            return current # or the value loaded by another thread in the meantime
+        # LazyMode.LAZY, LazyMode.BOUNDED
+        if self._laziness == LazyMode.BOUNDED:
+            bounded_cache = self._options.bounded_cache
+            cache_key = self._bounded_key(key)
             try:
-                return self._cache_dict[key]
+                cached = bounded_cache[cache_key]
             except KeyError:
                 pass
-        if self._laziness in (LazyMode.CACHED, LazyMode.EAGER):
+            else:
+                if hooks:
+                    emit(hooks, 'lookup', path=self.path, key=key, hit=True)
+                return cached
+            if hooks:
+                emit(hooks, 'lookup', path=self.path, key=key, hit=False)
+            return bounded_cache.add(cache_key, self._fetch(key, extension, self._laziness))
+        if hooks:
+            emit(hooks, 'lookup', path=self.path, key=key, hit=False)
+        return self._fetch(key, extension, self._laziness)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def _bounded_key(self, key) -> tuple:
+        """ key of the file contents in the bounded cache shared by all layers, the
+        storage tells apart layers with the same paths (e.g. the root '' of archives)
+        """
+        return ((self._options.storage, self.path), key)
+
+    def _peek(self, key: str):
+        """ self[key] without keeping anything newly loaded, subdirectories
+        are returned in LazyMode.LAZY
+        """
+        value = self._entries[key]
+        if type(value) is not _Unloaded:
+            return value
+        extension = value.extension
+        if self._options.bounded_cache is not None and extension is not None:
             try:
-                extension = self._lazy_dict.pop(key)
+                return self._options.bounded_cache[self._bounded_key(key)]
             except KeyError:
-                raise KeyError(key) from None
-            self._cache_dict[key] = (cache := self._fetch(key, extension, self._laziness))
-            return cache
-        # LazyMode.LAZY
-        try:
-            extension = self._lazy_dict[key]
-        except KeyError:
-            raise KeyError(key) from None
-        return self._fetch(key, extension, self._laziness)
+                pass
+        return self._fetch(key, extension, LazyMode.LAZY)
 
-    def force_load(self):
-        """ recursively loading all keys into _raw_dict essentially converting
-        to a normal dict
+    def _unloaded(self) -> list:
+        """ (key, extension) of the keys which are not loaded """
+        return [(key, value.extension) for key, value in self._entries.items()
+                if type(value) is _Unloaded]
+
+    def _loaded(self) -> list:
+        """ (key, value) of the loaded files and directories (not the keyfile) """
+        return [(key, value) for key, value in self._entries.items()
+                if type(value) is not _Unloaded and key not in self._raw_keys]
+
+    async def aget(self, key: str):
+        """ self[key] without blocking the event loop: files are read in the default
+        executor and concurrent calls for the same key share one load
+        """
+        value = self._entries[key]
+        if type(value) is not _Unloaded:
+            return value
+        loop = asyncio.get_running_loop()
+        if self._inflight is None:
+            self._inflight = {}
+        future = self._inflight.get(key)
+        if future is None or future.get_loop() is not loop:
+            future = loop.run_in_executor(None, self.__getitem__, key)
+            self._inflight[key] = future
+            future.add_done_callback(
+                lambda done: self._inflight.pop(key) if self._inflight.get(key) is done else None
+            )
+        # a cancelled caller must not cancel the load for the others
+        return await asyncio.shield(future)
+
+    async def aforce_load(self, workers: Optional[int] = None):
+        """ force_load in the default executor, see force_load """
+        await asyncio.get_running_loop().run_in_executor(None, self.force_load, workers)
+
+    def force_load(self, workers: Optional[int] = None):
+        """ recursively loading all keys essentially converting to a normal dict
+
+        Args:
+            workers (int, optional): number of threads reading and parsing files
+                concurrently. The result is identical to the sequential load.
+                Defaults to None (sequential).
         """
+        if workers:
+            with ThreadPoolExecutor(workers) as pool:
+                _parallel_force_load(self, pool)
+            return
         self._laziness = LazyMode.EAGER
-        for key, ext in self._lazy_dict.items():
-            self._cache_dict[key] = self._fetch(key, ext, LazyMode.EAGER)
-        self._lazy_dict = {}
+        for key, extension in self._unloaded():
+            self._entries[key] = self._fetch(key, extension, LazyMode.EAGER)
 
-    def as_dict(self):
+    def as_dict(self, workers: Optional[int] = None):
+        """ load everything into a primitive dict, see force_load for `workers` """
         if self._laziness in (LazyMode.CACHED, LazyMode.EAGER):
-            self.force_load()
-        result = {key: _as_primitive(value) for key, value in self._cache_dict.items()}
-        for key, ext in self._lazy_dict.items():
-            result[key] = _as_primitive(self._fetch(key, ext, LazyMode.EAGER))
-        result.update(self._raw_dict)
+            self.force_load(workers)
+        result = {}
+        lazy_items = [] # LazyMode.LAZY, BOUNDED: nothing is kept, load by key
+        for key, value in self._entries.items():
+            if type(value) is _Unloaded:
+                result[key] = None # keeps the order of the keys
+                lazy_items.append((key, value.extension))
+            elif key in self._raw_keys:
+                result[key] = value
+            else:
+                result[key] = _as_primitive(value)
+        if workers and lazy_items:
+            with ThreadPoolExecutor(workers) as pool:
+                values = pool.map(
+                    lambda item: _as_primitive(self._fetch(*item, LazyMode.EAGER)), lazy_items)
+                result.update(zip((key for key, _ in lazy_items), values))
+        else:
+            for key, extension in lazy_items:
+                result[key] = _as_primitive(self._fetch(key, extension, LazyMode.EAGER))
         return result
 
     def as_primitive(self):
         """ alias for as_dict"""
         return self.as_dict()
 
+    def _load_keyfile(self):
+        extension = self._manifest.entries.get(KEYFILE, '')
+        for key in self._raw_keys:
+            self._entries.pop(key, None)
+        self._raw_keys = _NO_KEYS
+        self._keyfile_signature = None
+        if extension == '': # no KEYFILE
+            return
+        assert extension is not None, "dictionary with name __config__ is not allowed"
+        options = self._options
+        keyfile = options.storage.join(self.path, KEYFILE + extension)
+        raw_dict, self._keyfile_signature = load_signed(
+            keyfile, options.extension_map[extension], options.parse_cache, options.hooks,
+            options.storage
+        )
+        assert isinstance(raw_dict, dict), ("naked list in Keyfile not allowed: "
+            "use list in a lower level or a LazyList in directory")
+
+        assert not raw_dict.keys() & self._manifest.entries.keys(), 'duplicate keys not allowed'
+        raw_dict = {
+            sys.intern(key) if type(key) is str else key: value
+            for key, value in raw_dict.items()
+        }
+        self._raw_keys = frozenset(raw_dict)
+        self._entries.update(raw_dict)
+
+    def refresh(self) -> bool:
+        """ reload what changed on disk since it was loaded and keep everything else
+
+        compares the modification times of the directories (added or removed
+        entries) and the modification times and sizes of the loaded files with
+        the ones recorded when they were loaded. Changed entries are dropped and
+        loaded again on their next access (immediately in LazyMode.EAGER).
+
+        Returns:
+            bool: whether anything changed
+        """
+        storage = self._options.storage
+        changed = False
+        if storage.mtime(self.path) != self._manifest.mtime:
+            changed = self._rescan()
+
+        extension = self._manifest.entries.get(KEYFILE)
+        keyfile_signature = None
+        if extension:
+            keyfile_signature = storage.signature(storage.join(self.path, KEYFILE + extension))
+        if keyfile_signature != self._keyfile_signature:
+            self._load_keyfile()
+            changed = True
+
+        for key, signature in list(self._file_stats.items()):
+            extension = self._manifest.entries.get(key)
+            if extension is None or storage.signature(
+                storage.join(self.path, key + extension)) != signature:
+                self._drop(key)
+                changed = True
+
+        for key, value in self._loaded():
+            if isinstance(value, LazyDict):
+                changed = value.refresh() or changed
+                if not self._same_dir_type(value):
+                    self._drop(key)
+                    changed = True
+            elif isinstance(value, LazyList) and not isinstance(value, PackedList):
+                # PackedLists are files, they are checked with the other files above
+                if not self._same_dir_type(value):
+                    self._drop(key)
+                    changed = True
+                elif value.refresh():
+                    changed = True
+
+        if self._digests and not changed:
+            for key, (signature, _) in self._digests.items():
+                extension = self._manifest.entries.get(key)
+                if signature is not None and (extension is None or storage.signature(
+                    storage.join(self.path, key + extension)) != signature):
+                    changed = True # fingerprinted, but not loaded
+                    break
+        if changed:
+            self._digests = None
+
+        if changed and self._laziness == LazyMode.EAGER:
+            self.force_load()
+        return changed
+
+    def _rescan(self) -> bool:
+        """ scan the directory again and drop added, removed or retyped entries """
+        old_entries = self._manifest.entries
+        self._manifest = self._scan(self.path)
+        new_entries = self._manifest.entries
+        changed = False
+        for key in old_entries.keys() | new_entries.keys():
+            if key != KEYFILE and old_entries.get(key, '') != new_entries.get(key, ''):
+                self._drop(key)
+                changed = True
+        return changed
+
+    def _same_dir_type(self, child) -> bool:
+        """ whether the cached directory child still has the right type (list or dict),
+        LazyDict children have to be refreshed before
+        """
+        manifest = child._manifest
+        extensions = self._options.extensions
+        if isinstance(child, LazyList) and (
+            manifest is None or self._options.storage.mtime(child.path) != manifest.mtime):
+            child._manifest = manifest = self._scan(child.path)
+        try:
+            is_list = manifest_is_lazyList(child.path, manifest, extensions)
+        except AssertionError: # broken list directory, fail on the next access
+            return False
+        if isinstance(child, LazyList):
+            return is_list == (child.extension, child.length)
+        return is_list is None
+
+    def _drop(self, key):
+        """ forget the loaded value of key, the key is lazy again if it still exists """
+        self._file_stats.pop(key, None)
+        if self._options.bounded_cache is not None:
+            self._options.bounded_cache.pop(self._bounded_key(key))
+        extension = self._manifest.entries.get(key, '')
+        if extension == '' or key == KEYFILE: # removed
+            self._entries.pop(key, None)
+        else:
+            self._entries[key] = _unloaded(extension)
+
     def _fetch(self, key, extension, laziness: LazyMode):
+        options = self._options
+        storage = options.storage
         if extension is None: # is dir
-            path = os.path.join(self.path, key)
+            path = storage.join(self.path, key)
+            manifest = self._scan(path)
             #is LazyList?
-            if result:= dir_is_lazyList(path, self.extension_map.keys()):
+            if result:= manifest_is_lazyList(path, manifest, options.extensions):
                 extension, length = result
-                return LazyList(path, length, extension, self.extension_map[extension], laziness)
-            return LazyDict(path, laziness, self.extension_map)
+                return LazyList(
+                    path, length, extension, options.extension_map[extension],
+                    laziness, options.parse_cache, options.list_cache_size,
+                    options.bounded_cache, manifest, options.hooks, storage
+                )
+            return LazyDict(path, laziness, manifest=manifest, options=options)
         else: # is file
-            path = os.path.join(self.path, key + extension)
-            return load(path, loader=self.extension_map[extension])
+            path = storage.join(self.path, key + extension)
+            if extension == PACKED_LIST_EXTENSION:
+                value = PackedList(
+                    path, laziness, options.parse_cache, options.list_cache_size,
+                    options.bounded_cache, options.hooks, storage
+                )
+                signature = value._signature
+            else:
+                value, signature = load_signed(
+                    path, options.extension_map[extension], options.parse_cache,
+                    options.hooks, storage, laziness != LazyMode.LAZY
+                )
+            if laziness != LazyMode.LAZY:
+                self._file_stats[key] = signature
+                digests = self._digests # of other contents? see lazyConfig.fingerprints
+                if digests is not None and digests.get(key, (signature,))[0] != signature:
+                    self._digests = None
+            return value
+
+    def _scan(self, path: str) -> DirManifest:
+        if self._options.hooks:
+            emit(self._options.hooks, 'scan', path=path)
+        return self._options.storage.scan(path, self._options.extensions)
 
     def __len__(self):
-        return len(self._raw_dict) + len(self._lazy_dict) + len(self._cache_dict)
+        return len(self._entries)
 
     def __iter__(self):
-        return iter(
-            list(self._raw_dict.keys())
-            + list(self._cache_dict.keys())
-            + list(self._lazy_dict.keys())
-        )
+        return iter(list(self._entries))
 
     def __repr__(self):
         return f"LazyDict(path='{self.path}')"
 
     def __str__(self):
+        raw = {key: self._entries[key] for key in self._raw_keys}
         return (
             f"LazyDict(path={self.path}):\n"
             + "    Loaded Dict: "
-            + self._raw_dict.__str__() + "\n"
+            + raw.__str__() + "\n"
             + "    Cached: "
-            + self._cache_dict.__str__() + "\n"
+            + dict(self._loaded()).__str__() + "\n"
             + "    Lazy Keys: "
-            + self._lazy_dict.__str__() + '\n'
+            + dict(self._unloaded()).__str__() + '\n'
         )
 
+def _parallel_force_load(root: LazyDict, pool: Executor):
+    """ force_load the tree below root, reading files and scanning directories
+    in the pool. Directories are expanded as soon as they are scanned, the results
+    are only assigned at the end in the order a sequential load would use.
+    """
+    pending = {} # future -> (results of the node, key)
+    expanded = [] # (node, results)
+    lists = [] # (lazy_list, results)
+
+    def expand(node: LazyDict):
+        results = {}
+        expanded.append((node, results))
+        for key, ext in node._unloaded():
+            # children are loaded here instead of by their EAGER constructor
+            pending[pool.submit(node._fetch, key, ext, LazyMode.CACHED)] = (results, key)
+        for _, value in node._loaded():
+            expand_value(value)
+
+    def expand_list(lazy_list: LazyList):
+        results = {}
+        lists.append((lazy_list, results))
+        for idx in range(lazy_list.length):
+            if idx not in lazy_list._cache:
+                pending[pool.submit(lazy_list._load, idx)] = (results, idx)
+
+    def expand_value(value):
+        if isinstance(value, LazyDict):
+            expand(value)
+        elif isinstance(value, LazyList):
+            expand_list(value)
+
+    expand(root)
+    try:
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                results, key = pending.pop(future)
+                results[key] = value = future.result()
+                expand_value(value)
+    except BaseException:
+        for future in pending:
+            future.cancel()
+        raise
+
+    for node, results in expanded:
+        node._laziness = LazyMode.EAGER
+        node._entries.update(results)
+    for lazy_list, results in lists:
+        cache = lazy_list._cache
+        lazy_list._laziness = LazyMode.EAGER
+        lazy_list._max_cached = None
+        lazy_list._cache = {idx: results[idx] if idx in results else cache[idx]
+                            for idx in range(lazy_list.length)}
+
 def _as_primitive(obj):
     if isinstance(obj, (list, dict)):
         return obj
-    if isinstance(obj, (LazyDict, LazyList)):
+    if isinstance(obj, (LazyDict, LazyList, JSONView, JSONListView)):
         return obj.as_primitive()
     raise ValueError('Not a LazyData Type')
 
-def files_in_dir_with_given_ext(dir_path: str, extensions: list) -> list:
+def manifest_is_lazyList(
+    path: str, manifest: DirManifest, extension_list
+) -> Optional[Tuple[str, int]]:
+    """ (extension, length) if the scanned directory is a list directory, else None """
+    for ext in extension_list:
+        if manifest.entries.get('0') == ext:
+            length = manifest.size
+            assert manifest.entries.get(f'{length-1}') == ext, (
+                f"the file {length-1}{ext} for {length} being the number of files in {path}"
+                f"does not exist. Even though it is implied by the file 0{ext}")
+            return (ext, length)
+    return None
+
+def files_in_dir_with_given_ext(dir_path: str, extensions: list) -> dict:
     """ returns dictionary of filenames (stripped of their extension) of files in the
     given directory with extensions from the given `extensions` list.
 
-    Example:
-        extensions: ['.txt']
-        dir: file1.txt, file2.py
-        -> Output: {'file1' : '.txt'}
-
-    names of directories map to None to differentiate it from files with no
-    extension i.e. ''.
+    names of directories map to None, see scan_dir
     """
-    result = {}
-    for filename in os.listdir(dir_path):
-        name, extension = os.path.splitext(filename)
-        if extension == '' and os.path.isdir(os.path.join(dir_path, filename)):
-            result[name] = None
-        elif extension in extensions:
-            result[name] = extension
-    return result
+    return scan_dir(dir_path, extensions).entries
 
 def dir_is_lazyList(path: str, extension_list: list) -> Optional[Tuple[str, int]]:
-    for ext in extension_list:
-        if os.path.isfile(os.path.join(path, '0'+ext)):
-            length = len(os.listdir(path))
-            assert os.path.isfile(
-                os.path.join(path, f'{length-1}'+ext)
-            ), (f"the file {length-1}{ext} for {length} being the number of files in {path}"
-                f"does not exist. Even though it is implied by the file 0{ext}")
-            return (ext, length)
-    return None
+    return manifest_is_lazyList(path, scan_dir(path, extension_list), extension_list)
 
-def load(path: str, loader: Callable[[], Union[dict, list]]) -> Union[dict, list]:
+def load(
+    path: str, loader: Callable[[], Union[dict, list]],
+    parse_cache: Optional[ParseCache] = None, hooks: tuple = (),
+    storage: FileStorage = FILE_STORAGE
+) -> Union[dict, list]:
     """ load file from path using the provided loader 
     :param path: path to the file to load
     :param loader: a dictionary mapping extensions (e.g. '.json') to a callable
     which accepts a filestream and returns either a dict or list
+    :param parse_cache: optional ParseCache to look up the parsed file in
+    :param hooks: callables notified with a 'parse' event, see lazyConfig.stats
+    :param storage: to read the file from, the parse cache only supports FileStorage
     :return: the loaded file (dict or list)
     """
-    with open(path, 'r') as cfg_file:
-        return loader(cfg_file)
+    return load_signed(path, loader, parse_cache, hooks, storage, signed=False)[0]
+
+def load_signed(
+    path: str, loader: Callable[[], Union[dict, list]],
+    parse_cache: Optional[ParseCache] = None, hooks: tuple = (),
+    storage: FileStorage = FILE_STORAGE, signed: bool = True
+) -> Tuple[Union[dict, list], Optional[tuple]]:
+    """ like load, additionally returns the signature of the loaded file (see
+    FileStorage.signature) for refresh(), taken from the opened file or the stat
+    of the parse cache instead of another stat of the path. None if not `signed`.
+    """
+    start = time.perf_counter() if hooks else 0.0
+    signature = None
+    if parse_cache is not None:
+        data, parsed, stat = parse_cache.lookup(path, loader)
+        if signed:
+            signature = stat_signature(stat)
+    else:
+        with storage.open(path) as cfg_file:
+            if signed:
+                signature = storage.opened_signature(cfg_file, path)
+            data = loader(cfg_file)
+        parsed = True
+    if hooks and parsed: # a hit of the parse cache is no parse
+        emit(hooks, 'parse', path=path, extension=os.path.splitext(path)[1],
+             seconds=time.perf_counter() - start)
+    return data, signature
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+
+from typing import Callable, Tuple, Union
+import os, hashlib, pickle, tempfile
+
+from .parsers import loader_key
+
+DEFAULT_CACHE_SIZE = 64 * 2**20 # bytes
+ENTRY_SUFFIX = '.pickle'
+
+
+class ParseCache:
+    """ a directory of pickled parse results to skip parsing on cold starts
+
+    Entries are keyed by the absolute path of the file and the loader used
+    (see parsers.loader_key), files of loaders without such an identity are
+    parsed but not cached. They are only used if the inode, size and modification time of the file
+    still match, otherwise the file is parsed again and the entry replaced.
+    If the total size of the entries exceeds `max_size` the oldest entries
+    are deleted.
+
+    Only point this to a directory you trust: entries are unpickled.
+    """
+    def __init__(self, directory: str, max_size: int = DEFAULT_CACHE_SIZE):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._size = sum(size for _, size, _ in self._entries())
+
+    def load(self, path: str, loader: Callable) -> Union[dict, list]:
+        """ return the cached parse result of path or parse it with the loader """
+        return self.lookup(path, loader)[0]
+
+    def lookup(
+        self, path: str, loader: Callable
+    ) -> Tuple[Union[dict, list], bool, os.stat_result]:
+        """ like load, additionally returns whether the file had to be parsed and
+        the stat of the file the entry was checked against
+        """
+        stat = os.stat(path)
+        signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        key = loader_key(loader)
+        if key is None: # entries of other loaders could be mistaken for its own
+            with open(path, 'r') as cfg_file:
+                return loader(cfg_file), True, stat
+        entry = self._entry_path(path, key)
+        try:
+            with open(entry, 'rb') as entry_file:
+                cached_signature, data = pickle.load(entry_file)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            pass
+        else:
+            if cached_signature == signature:
+                self.hits += 1
+                return data, False, stat
+        self.misses += 1
+        with open(path, 'r') as cfg_file:
+            data = loader(cfg_file)
+        self._store(entry, (signature, data))
+        return data, True, stat
+
+    def clear(self):
+        """ delete all entries """
+        for entry, _, _ in self._entries():
+            _remove(entry)
+        self._size = 0
+
+    def _entry_path(self, path: str, key: str) -> str:
+        digest = hashlib.sha1(
+            f"{os.path.abspath(path)}\0{key}".encode()
+        ).hexdigest()
+        return os.path.join(self.directory, digest + ENTRY_SUFFIX)
+
+    def _store(self, entry: str, value):
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        except OSError:
+            return # the cache is an optimization, parsing worked nonetheless
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                pickle.dump(value, tmp_file, protocol=pickle.HIGHEST_PROTOCOL)
+            size = os.path.getsize(tmp)
+            os.replace(tmp, entry) # atomic, concurrent readers never see partial entries
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            _remove(tmp)
+            return
+        self._size += size
+        if self._size > self.max_size:
+            self._evict()
+
+    def _evict(self):
+        """ delete the oldest entries until the cache is below 3/4 of max_size """
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        self._size = sum(size for _, size, _ in entries)
+        while entries and self._size > self.max_size * 3 // 4:
+            entry, size, _ = entries.pop(0)
+            _remove(entry)
+            self._size -= size
+
+    def _entries(self):
+        with os.scandir(self.directory) as it:
+            for dir_entry in it:
+                if dir_entry.name.endswith(ENTRY_SUFFIX):
+                    try:
+                        stat = dir_entry.stat()
+                    except OSError:
+                        continue
+                    yield dir_entry.path, stat.st_size, stat.st_mtime_ns
+
+    def __repr__(self):
+        return f"ParseCache(directory='{self.directory}', max_size={self.max_size})"
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
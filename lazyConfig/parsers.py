@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+""" registry of parser backends per file extension
+
+For every extension the available backends are listed from fastest to
+slowest. The fastest available one is active by default, another one can be
+selected explicitly with `select_backend`. `DEFAULT_EXTENSION_MAP` always maps
+every extension to the loader of its active backend.
+"""
+
+from typing import Callable, Dict, List, Optional, Union
+from _io import TextIOWrapper
+import json
+
+import yaml
+
+from .partialJson import PartialJSONLoader
+
+Loader = Callable[[TextIOWrapper], Union[dict, list]]
+
+# extension -> {backend name: loader}, ordered by preference
+_BACKENDS: Dict[str, Dict[str, Loader]] = {}
+_ACTIVE: Dict[str, str] = {}
+_LOADER_KEYS: Dict[Loader, str] = {} # loader -> '<extension>:<name>' of its first registration
+
+DEFAULT_EXTENSION_MAP: Dict[str, Loader] = {}
+
+
+def register_backend(extension: str, name: str, loader: Loader, preferred: bool = False):
+    """ make a loader available for an extension
+
+    Args:
+        extension (str): file extension including the dot, e.g. '.yml'
+        name (str): name of the backend used by `select_backend`
+        loader (Loader): callable accepting a text stream and returning a dict or list
+        preferred (bool, optional): register in front of the existing backends and
+            activate it. Otherwise it is only activated if it is the first backend
+            of this extension. Defaults to False.
+    """
+    try:
+        _LOADER_KEYS.setdefault(loader, f"{extension}:{name}")
+    except TypeError: # not hashable, see loader_key
+        pass
+    backends = _BACKENDS.setdefault(extension, {})
+    backends.pop(name, None)
+    if preferred:
+        _BACKENDS[extension] = {name: loader, **backends}
+    else:
+        backends[name] = loader
+    if preferred or extension not in _ACTIVE:
+        select_backend(extension, name)
+
+def select_backend(extension: str, name: str):
+    """ use the backend `name` for files with the given extension
+
+    only affects configurations built afterwards
+
+    Raises:
+        ValueError: if the backend is not available (e.g. not installed)
+    """
+    try:
+        loader = _BACKENDS[extension][name]
+    except KeyError:
+        raise ValueError(
+            f"backend {name} for {extension} is not available, "
+            f"available: {available_backends(extension)}"
+        ) from None
+    _ACTIVE[extension] = name
+    DEFAULT_EXTENSION_MAP[extension] = loader
+
+def loader_key(loader: Loader) -> Optional[str]:
+    """ identity of a loader which is the same in every process, e.g. to key the
+    entries of the ParseCache
+
+    That is the `cache_key` attribute of the loader or, for registered backends,
+    '<extension>:<backend name>'. None if the loader has neither, e.g. a lambda.
+    """
+    key = getattr(loader, 'cache_key', None)
+    if key is not None:
+        return key
+    try:
+        return _LOADER_KEYS.get(loader)
+    except TypeError:
+        return None
+
+def available_backends(extension: str) -> List[str]:
+    """ names of the installed backends for the extension, fastest first """
+    return list(_BACKENDS.get(extension, {}))
+
+def active_backend(extension: str) -> str:
+    """ name of the backend currently used for the extension """
+    return _ACTIVE[extension]
+
+def active_backends() -> Dict[str, str]:
+    """ name of the backend currently used for every extension """
+    return dict(_ACTIVE)
+
+
+# YAML: safe loaders are the default, the unsafe ones can be selected explicitly
+def pyyaml_safe_load(stream):
+    return yaml.load(stream, Loader=yaml.SafeLoader)
+
+_YAML_BACKENDS = {}
+if yaml.__with_libyaml__:
+    def libyaml_safe_load(stream):
+        return yaml.load(stream, Loader=yaml.CSafeLoader)
+
+    def libyaml_unsafe_load(stream):
+        return yaml.load(stream, Loader=yaml.CUnsafeLoader)
+
+    _YAML_BACKENDS['libyaml'] = libyaml_safe_load
+_YAML_BACKENDS['pyyaml'] = pyyaml_safe_load
+if yaml.__with_libyaml__:
+    _YAML_BACKENDS['libyaml-unsafe'] = libyaml_unsafe_load
+_YAML_BACKENDS['pyyaml-unsafe'] = yaml.unsafe_load
+
+for _ext in ('.yml', '.yaml'):
+    for _name, _loader in _YAML_BACKENDS.items():
+        register_backend(_ext, _name, _loader)
+
+# JSON
+try:
+    import orjson
+except ImportError:
+    pass
+else:
+    def orjson_load(stream):
+        data = stream.read()
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # NaN, Infinity and integers beyond 64 bit are accepted by json
+            return json.loads(data)
+
+    register_backend('.json', 'orjson', orjson_load)
+register_backend('.json', 'json', json.load)
+# memory mapped views of large files, see partialJson (not active by default)
+register_backend('.json', 'partial', PartialJSONLoader())
+
+# JSON Lines: only used for lists of lists, a .jsonl file in a directory becomes
+# a lazyData.PackedList decoding its lines on access
+def jsonl_load(stream):
+    return [json.loads(line) for line in stream if line.strip()]
+
+register_backend('.jsonl', 'json', jsonl_load)
+
+# TOML
+try:
+    import tomllib # python >= 3.11
+except ImportError:
+    pass
+else:
+    def tomllib_load(stream):
+        return tomllib.loads(stream.read())
+
+    register_backend('.toml', 'tomllib', tomllib_load)
+try:
+    import toml
+except ImportError:
+    pass
+else:
+    register_backend('.toml', 'toml', toml.load)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+""" read single keys of large JSON files without parsing the whole file
+
+The file is memory mapped. An object (or array) is only tokenized when it is
+accessed for the first time, which yields an index from its keys (indices) to
+the byte spans of their values. Values are only decoded when accessed: nested
+objects and arrays become views themselves, everything else is decoded with
+json.loads from its span.
+
+Views pickle their path, span and index (not the contents). With a ParseCache
+the index of the top level object is therefore only built once per version of
+the file.
+
+Replace files atomically (write and rename), truncating a mapped file in place
+crashes the process reading it.
+"""
+
+from typing import Union
+from collections.abc import Sequence, Mapping
+import os, io, re, json, mmap
+
+DEFAULT_PARTIAL_THRESHOLD = 16 * 2**20 # bytes
+
+# strings (which might contain brackets) and the structural characters
+_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\],]')
+_NESTED_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]]')
+_WHITESPACE = b' \t\n\r'
+_OPEN = b'{['
+_CLOSE = b'}]'
+
+
+class JSONView(Mapping):
+    """ read only view of a JSON object inside a memory mapped file """
+    __slots__ = ('_buf', '_path', '_start', '_end', '_index', '_values')
+
+    def __init__(self, buf, path: str, start: int, end: int):
+        self._buf = buf
+        self._path = path
+        self._start = start
+        self._end = end
+        self._index = None # key -> (start, end) of the value
+        self._values = {}
+
+    def _spans(self) -> dict:
+        if self._index is None:
+            self._index = _scan(self._buf, self._start, self._end, is_object=True)
+        return self._index
+
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        start, end = self._spans()[key]
+        self._values[key] = value = _decode(self._buf, self._path, start, end)
+        return value
+
+    def __len__(self):
+        return len(self._spans())
+
+    def __iter__(self):
+        return iter(self._spans())
+
+    def as_dict(self) -> dict:
+        """ decode the whole object """
+        return json.loads(self._buf[self._start:self._end])
+
+    def as_primitive(self):
+        """ alias for as_dict """
+        return self.as_dict()
+
+    def __reduce__(self):
+        return _reopen, (type(self), self._path, self._start, self._end, self._spans())
+
+    def __repr__(self):
+        return f"JSONView(span=({self._start}, {self._end}))"
+
+
+class JSONListView(Sequence):
+    """ read only view of a JSON array inside a memory mapped file """
+    __slots__ = ('_buf', '_path', '_start', '_end', '_index', '_values')
+
+    def __init__(self, buf, path: str, start: int, end: int):
+        self._buf = buf
+        self._path = path
+        self._start = start
+        self._end = end
+        self._index = None # list of (start, end) of the elements
+        self._values = {}
+
+    def _spans(self) -> list:
+        if self._index is None:
+            self._index = _scan(self._buf, self._start, self._end, is_object=False)
+        return self._index
+
+    def __getitem__(self, key: Union[int, tuple, slice]):
+        if isinstance(key, slice):
+            return [self[idx] for idx in range(len(self))[key]]
+        if isinstance(key, tuple):
+            return [self[idx] for idx in key]
+        spans = self._spans()
+        if -len(spans) <= key < 0:
+            key += len(spans)
+        if not 0 <= key < len(spans):
+            raise IndexError(f'JSONListView index {key} out of range')
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        start, end = spans[key]
+        self._values[key] = value = _decode(self._buf, self._path, start, end)
+        return value
+
+    def __len__(self):
+        return len(self._spans())
+
+    def as_list(self) -> list:
+        """ decode the whole array """
+        return json.loads(self._buf[self._start:self._end])
+
+    def as_primitive(self):
+        """ alias for as_list """
+        return self.as_list()
+
+    def __eq__(self, other):
+        if (length:=len(self)) == len(other):
+            for idx in range(length):
+                if self[idx] != other[idx]:
+                    return False
+            return True
+        return False
+
+    def __reduce__(self):
+        return _reopen, (type(self), self._path, self._start, self._end, self._spans())
+
+    def __repr__(self):
+        return f"JSONListView(span=({self._start}, {self._end}))"
+
+
+class PartialJSONLoader:
+    """ loader for the extension map: files of at least `threshold` bytes are
+    returned as JSONView/JSONListView, smaller ones are parsed with json.load
+
+    Example:
+        lazyConfig.from_path(path, custom_extension_loader={
+            '.json': PartialJSONLoader(threshold=2**20)
+        })
+    """
+    def __init__(self, threshold: int = DEFAULT_PARTIAL_THRESHOLD):
+        self.threshold = threshold
+        self.cache_key = f"PartialJSONLoader({threshold})" # see parsers.loader_key
+
+    def __call__(self, stream):
+        try:
+            size = os.fstat(stream.fileno()).st_size
+        except (AttributeError, OSError, io.UnsupportedOperation): # e.g. inside an archive
+            return json.load(stream)
+        if size < max(self.threshold, 1):
+            return json.load(stream)
+        view = open_json(os.path.abspath(stream.name))
+        if isinstance(view, (JSONView, JSONListView)):
+            view._spans() # the top level is accessed anyway, store its index in the cache
+        return view
+
+    def __repr__(self):
+        return f"PartialJSONLoader(threshold={self.threshold})"
+
+
+def open_json(path: str):
+    """ memory map a JSON file and return a view of its top level object or array
+    (decoded values for other top level values)
+    """
+    buf = _map(path)
+    return _decode(buf, path, 0, len(buf))
+
+def _map(path: str):
+    with open(path, 'rb') as json_file:
+        return mmap.mmap(json_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+def _reopen(cls, path: str, start: int, end: int, index):
+    view = cls(_map(path), path, start, end)
+    view._index = index
+    return view
+
+
+def _strip(buf, start: int, end: int):
+    while start < end and buf[start] in _WHITESPACE:
+        start += 1
+    while end > start and buf[end-1] in _WHITESPACE:
+        end -= 1
+    return start, end
+
+def _decode(buf, path: str, start: int, end: int):
+    start, end = _strip(buf, start, end)
+    if start == end:
+        raise json.JSONDecodeError('Expecting value', '', start)
+    first = buf[start]
+    if first == ord('{'):
+        return JSONView(buf, path, start, end)
+    if first == ord('['):
+        return JSONListView(buf, path, start, end)
+    return json.loads(buf[start:end])
+
+def _scan(buf, start: int, end: int, is_object: bool) -> Union[dict, list]:
+    """ spans of the direct children of the object/array buf[start:end] """
+    index = {} if is_object else []
+    depth = 0
+    key = None
+    value_start = None
+    pos = start
+    while True:
+        # commas are only relevant for the direct children
+        match = (_TOKEN if depth <= 1 else _NESTED_TOKEN).search(buf, pos, end)
+        if match is None:
+            break
+        pos = match.end()
+        char = buf[match.start()]
+        if char in _OPEN:
+            depth += 1
+            if depth == 1:
+                value_start = pos
+            continue
+        if depth == 1 and char == ord('"') and is_object and key is None:
+            key = json.loads(buf[match.start():pos])
+            value_start = buf.find(b':', pos, end) + 1
+            continue
+        if depth == 1 and (char == ord(',') or char in _CLOSE):
+            if is_object:
+                if key is not None:
+                    index[key] = _strip(buf, value_start, match.start())
+                key = None
+            else:
+                span = _strip(buf, value_start, match.start())
+                if span[0] < span[1]:
+                    index.append(span)
+            value_start = pos
+        if char in _CLOSE:
+            depth -= 1
+            if depth == 0:
+                break
+    return index
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+""" learned prefetching: record the keys a process accesses, warm them on the next start
+
+    config = lazyConfig.from_path('path/to/config', record_profile=True)
+    ... # run the application
+    config.save_profile('app.profile')
+
+    # next start: the recorded keys are loaded in a background thread
+    config = lazyConfig.from_path('path/to/config', prefetch_profile='app.profile')
+
+The profile lists the keys looked up in the LazyDicts and LazyLists of every
+layer (relative to the root of the layer) in the order of their first access.
+"""
+
+from typing import List, Optional
+import os, json, threading
+
+from .lazyData import LazyDict, LazyMode
+from .config import Config
+
+PROFILE_VERSION = 1
+
+
+class AccessProfile:
+    """ hook recording the keys looked up in LazyDicts and LazyLists, see lazyConfig.stats """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.accesses = {} # (path of the directory, key) -> None in the order of first access
+
+    def __call__(self, event: str, **info):
+        if event == 'lookup':
+            access = (info['path'], info['key'])
+            if access not in self.accesses:
+                with self._lock:
+                    self.accesses.setdefault(access)
+
+    def __repr__(self):
+        return f"AccessProfile(accesses={len(self.accesses)})"
+
+
+def save_profile(config: Config, path: str):
+    """ write the keys accessed so far to path, see prefetch()
+
+    Raises:
+        ValueError: if the Config was not built with from_path(..., record_profile=True)
+    """
+    root = config._root if config._root is not None else config
+    for hook in root._hooks:
+        if isinstance(hook, AccessProfile):
+            break
+    else:
+        raise ValueError(
+            'no profile recorded, build the Config with '
+            'lazyConfig.from_path(..., record_profile=True)')
+    layers = sorted( # the innermost root of nested layers first
+        ((idx, layer) for idx, layer in enumerate([root._config, *root._override])
+         if isinstance(layer, LazyDict)),
+        key=lambda item: len(item[1].path), reverse=True
+    )
+    with hook._lock:
+        accesses = list(hook.accesses)
+    entries = []
+    for directory, key in accesses:
+        for idx, layer in layers:
+            parts = _relative(layer, directory)
+            if parts is not None:
+                entries.append([idx, parts, key])
+                break
+    with open(path, 'w') as profile:
+        json.dump({'version': PROFILE_VERSION, 'accesses': entries}, profile)
+
+def prefetch(config: Config, profile: str) -> threading.Thread:
+    """ load the keys recorded in the profile in a background thread
+
+    Entries which no longer exist are skipped, errors surface when the
+    application accesses the key itself. Nothing is kept in LazyMode.LAZY,
+    such layers are skipped.
+
+    Args:
+        config (Config): root configuration built from the same layers as the
+            one the profile was saved from
+        profile (str): path of a file written by save_profile
+
+    Returns:
+        threading.Thread: the (started) prefetching thread, join() it to wait
+    """
+    with open(profile) as f:
+        data = json.load(f)
+    if data.get('version') != PROFILE_VERSION:
+        raise ValueError(f'{profile} is not a lazyConfig access profile')
+    layers = [config._config, *config._override]
+    thread = threading.Thread(
+        target=_replay, args=(layers, data['accesses']), name='lazyConfig-prefetch', daemon=True)
+    thread.start()
+    return thread
+
+def _replay(layers: list, accesses: list):
+    for idx, parts, key in accesses:
+        try:
+            node = layers[idx]
+            if not isinstance(node, LazyDict) or node._laziness == LazyMode.LAZY:
+                continue
+            for part in parts:
+                if isinstance(node, LazyDict) and part not in node:
+                    # PackedLists are files, their key has no extension
+                    part = os.path.splitext(part)[0]
+                node = node[part]
+            node[key]
+        except Exception: # stale profile or broken file, the application will notice
+            continue
+
+def _relative(layer: LazyDict, directory: str) -> Optional[List[str]]:
+    """ keys leading from the root of the layer to the directory, None if outside """
+    if directory == layer.path:
+        return []
+    prefix = layer._options.storage.join(layer.path, '')
+    if directory.startswith(prefix):
+        return directory[len(prefix):].replace(os.sep, '/').split('/')
+    return None
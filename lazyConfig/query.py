@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+""" resolve many keys of a configuration in one pass
+
+    lazyConfig.select(config, ['database.connection.*', 'logging.level'])
+    # {'database.connection.timeout': 42, 'database.connection.hosts': ConfigList(...),
+    #  'logging.level': 'INFO'}
+
+The patterns are merged into a tree, so a prefix shared by several patterns is
+resolved once. The tree is walked level by level: the files a level needs in
+any layer are determined first (only keys matching a pattern, nothing else is
+loaded) and loaded as a batch, with `workers` threads concurrently. Storages
+which batch requests (see KVStorage.prefetch) read the files of a level at once.
+"""
+
+from typing import Iterable, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from fnmatch import fnmatchcase
+
+from .lazyData import LazyDict, LazyList, _Unloaded
+from .config import Config, ConfigList
+from .compiled import PATH_SEP
+
+_GLOB_CHARS = frozenset('*?[')
+_END = None # marks a pattern ending at this node of the pattern tree
+_GLOBBED = object() # marks the nodes of the pattern tree below a glob pattern
+
+
+def select(
+    config: Union[Config, ConfigList], patterns: Iterable[str], workers: Optional[int] = None
+) -> dict:
+    """ values of all keys matching one of the patterns
+
+    Args:
+        config (Union[Config, ConfigList]): the configuration to query
+        patterns (Iterable[str]): dotted paths, every part can be a glob pattern
+            (see fnmatch) matching keys or list indices of its level,
+            e.g. 'database.*.timeout' or 'hosts.[01].host'
+        workers (int, optional): number of threads loading the files of a level
+            concurrently. Defaults to None (sequential).
+
+    Raises:
+        KeyError: if a path without glob pattern does not exist, below a glob
+            pattern keys lacking the rest of the path are skipped
+
+    Returns:
+        dict: dotted path -> value (like config[key], so Config or ConfigList for
+            subtrees) in the order of the configuration
+    """
+    tree = {}
+    for pattern in patterns:
+        node = tree
+        globbed = False
+        for part in pattern.split(PATH_SEP):
+            globbed = globbed or not _GLOB_CHARS.isdisjoint(part)
+            node = node.setdefault(part, {})
+            if globbed:
+                node[_GLOBBED] = True
+        node[_END] = True
+
+    found = [] # (positions of the keys in their nodes, dotted path, value)
+    level = [((), (), config, [tree])]
+    with ThreadPoolExecutor(workers) if workers else nullcontext() as pool:
+        while level:
+            matches = [(path, order, node, _match(path, node, branches))
+                       for path, order, node, branches in level]
+            _prefetch([(path, node, children) for path, _, node, children in matches], pool)
+            level = []
+            for path, order, node, children in matches:
+                for position, (key, branches) in enumerate(children.items()):
+                    value = node[key]
+                    sub_path = path + (key,)
+                    sub_order = order + (position,)
+                    if any(_END in branch for branch in branches):
+                        found.append((sub_order, PATH_SEP.join(map(str, sub_path)), value))
+                    branches = [branch for branch in branches if any(map(_is_part, branch))]
+                    if not branches:
+                        continue
+                    if isinstance(value, (Config, ConfigList)):
+                        level.append((sub_path, sub_order, value, branches))
+                    else:
+                        _match(sub_path, {}, branches) # raises for literal paths
+    found.sort(key=lambda item: item[0]) # the levels were resolved one after another
+    return {path: value for _, path, value in found}
+
+def _is_part(key) -> bool:
+    """ whether the key of a pattern tree node is a part of a pattern, not a marker """
+    return key is not _END and key is not _GLOBBED
+
+def _match(path: tuple, node, branches: list) -> dict:
+    """ key -> pattern subtrees for the keys of node matching one of the branches """
+    children = {}
+    for branch in branches:
+        for part, subtree in branch.items():
+            if not _is_part(part):
+                continue
+            if _GLOB_CHARS.isdisjoint(part):
+                key = _key(node, part)
+                if key is None:
+                    if _GLOBBED in branch: # a key matched by a glob pattern lacks it
+                        continue
+                    raise KeyError(
+                        f"{PATH_SEP.join(map(str, path + (part,)))} does not exist")
+                children.setdefault(key, []).append(subtree)
+                continue
+            keys = range(len(node)) if isinstance(node, ConfigList) else node
+            for key in keys:
+                if fnmatchcase(str(key), part):
+                    children.setdefault(key, []).append(subtree)
+    if isinstance(node, Config): # keep the order of the configuration
+        return {key: children[key] for key in node if key in children}
+    return dict(sorted(children.items()))
+
+def _key(node, part: str):
+    """ part as key of node, None if it does not exist """
+    if isinstance(node, ConfigList):
+        try:
+            idx = int(part)
+        except ValueError:
+            return None
+        return idx if -len(node) <= idx < len(node) else None
+    if isinstance(node, Config) and part in node._config:
+        return part
+    return None
+
+def _prefetch(matches: list, pool):
+    """ load the files of all layers the next level resolves as one batch
+    (in the pool, without pool they are loaded when their keys are resolved)
+    """
+    loads = []
+    for _, node, children in matches:
+        if isinstance(node, ConfigList):
+            lazy_list = node.list
+            if isinstance(lazy_list, LazyList) and node._cacheable:
+                loads += [(lazy_list, idx % len(lazy_list)) for idx in children
+                          if idx % len(lazy_list) not in lazy_list._cache]
+            continue
+        if not node._cacheable: # LazyMode.LAZY: nothing would be kept
+            continue
+        for layer in [node._config, *node._override]:
+            if isinstance(layer, LazyDict):
+                loads += [(layer, key) for key in children if key not in node._cache
+                          and type(layer._entries.get(key)) is _Unloaded]
+    files = {} # storage -> paths of the files to load
+    for layer, key in loads:
+        if isinstance(layer, LazyDict) and (extension := layer._entries[key].extension):
+            storage = layer._options.storage
+            files.setdefault(storage, []).append(storage.join(layer.path, key + extension))
+    for storage, paths in files.items():
+        storage.prefetch(paths)
+    if pool is not None:
+        for _ in pool.map(_load, loads):
+            pass
+
+def _load(load: tuple):
+    container, key = load
+    container[key]
@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+""" share a configuration between (pre-forked) processes through a memory mapped file
+
+The parent publishes the merged configuration once, the workers attach to it:
+
+    lazyConfig.from_path('path/to/config', ['path/to/override']).publish('/dev/shm/app.cfg')
+    ...
+    config = lazyConfig.attach('/dev/shm/app.cfg') # in every worker
+
+The blob consists of one record per mapping or list. A record is the pickled
+table of its direct children: leaves are stored inline, nested mappings and
+lists as the offset of their own record. Attaching maps the file read only,
+so all workers share its pages, and a record is only decoded when its node is
+accessed for the first time.
+
+Like the parse cache the blob is unpickled, only attach to files you trust.
+"""
+
+from __future__ import annotations
+from typing import Union
+from collections.abc import Sequence, Mapping
+import os, mmap, struct, pickle, tempfile
+
+import lazyConfig # config.py imports this module, use lazyConfig.X to avoid circular imports
+
+MAGIC = b'lazyCfg1'
+_HEADER = struct.Struct('<8sQ') # magic, offset of the root record
+_RECORD = struct.Struct('<cQ') # kind (b'd' mapping, b'l' list), length of the pickle
+
+
+class _Ref(int):
+    """ offset of the record of a nested mapping or list """
+    __slots__ = ()
+
+
+class SharedView(Mapping):
+    """ read only mapping decoded lazily from a published blob """
+    __slots__ = ('_buf', '_offset', '_table', '_children')
+
+    def __init__(self, buf, offset: int):
+        self._buf = buf
+        self._offset = offset
+        self._table = None # key -> leaf or _Ref
+        self._children = {} # key -> decoded SharedView/SharedListView
+
+    def _entries(self):
+        if self._table is None:
+            self._table = _read_record(self._buf, self._offset)
+        return self._table
+
+    def __getitem__(self, key):
+        value = self._entries()[key]
+        if type(value) is not _Ref:
+            return value
+        try:
+            return self._children[key]
+        except KeyError:
+            return self._children.setdefault(key, _node(self._buf, value))
+
+    def __len__(self):
+        return len(self._entries())
+
+    def __iter__(self):
+        return iter(self._entries())
+
+    def as_dict(self) -> dict:
+        """ decode the whole mapping """
+        return {key: _as_primitive(value) for key, value in self.items()}
+
+    def as_primitive(self):
+        """ alias for as_dict """
+        return self.as_dict()
+
+    def __repr__(self):
+        return f"SharedView(offset={self._offset})"
+
+
+class SharedListView(Sequence):
+    """ read only list decoded lazily from a published blob """
+    __slots__ = ('_buf', '_offset', '_table', '_children')
+
+    def __init__(self, buf, offset: int):
+        self._buf = buf
+        self._offset = offset
+        self._table = None # list of leaves and _Ref
+        self._children = {}
+
+    def _entries(self):
+        if self._table is None:
+            self._table = _read_record(self._buf, self._offset)
+        return self._table
+
+    def __getitem__(self, key: Union[int, tuple, slice]):
+        if isinstance(key, slice):
+            return [self[idx] for idx in range(len(self))[key]]
+        if isinstance(key, tuple):
+            return [self[idx] for idx in key]
+        value = self._entries()[key]
+        if type(value) is not _Ref:
+            return value
+        if key < 0:
+            key += len(self._table)
+        try:
+            return self._children[key]
+        except KeyError:
+            return self._children.setdefault(key, _node(self._buf, value))
+
+    def __len__(self):
+        return len(self._entries())
+
+    def as_list(self) -> list:
+        """ decode the whole list """
+        return [_as_primitive(value) for value in self]
+
+    def as_primitive(self):
+        """ alias for as_list """
+        return self.as_list()
+
+    def __eq__(self, other):
+        if (length:=len(self)) == len(other):
+            for idx in range(length):
+                if self[idx] != other[idx]:
+                    return False
+            return True
+        return False
+
+    def __repr__(self):
+        return f"SharedListView(offset={self._offset})"
+
+
+def publish(config: Union[lazyConfig.Config, lazyConfig.ConfigList], path: str, strip_none: bool = False):
+    """ write the merged configuration to path for other processes to attach()
+
+    The configuration is exported file by file like dump_json, it stays lazy.
+    The file is replaced atomically, processes attached to the previous version
+    keep reading it until they attach again.
+
+    Args:
+        config (Union[Config, ConfigList]): the configuration to publish
+        path (str): target file, e.g. in /dev/shm to keep it in memory
+        strip_none (bool, optional): skip keys with value None. Defaults to False
+            (attached configurations behave like the original).
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as blob:
+            blob.write(_HEADER.pack(MAGIC, 0))
+            writer = _Writer(blob, strip_none)
+            if isinstance(config, lazyConfig.ConfigList):
+                root = writer.sequence(config.list)
+            else:
+                root = writer.mapping(config._config, config._override)
+            blob.seek(0)
+            blob.write(_HEADER.pack(MAGIC, root))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+def attach(path: str) -> Union[lazyConfig.Config, lazyConfig.ConfigList]:
+    """ map a configuration published with publish() read only
+
+    Returns:
+        Union[Config, ConfigList]: decoding the records on first access
+    """
+    with open(path, 'rb') as blob:
+        buf = mmap.mmap(blob.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, root = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError(f'{path} is not a published lazyConfig')
+    node = _node(buf, root)
+    if isinstance(node, SharedListView):
+        return lazyConfig.ConfigList(node)
+    return lazyConfig.Config(node, [])
+
+
+class _Writer:
+    """ writes the records of the children before the record of their parent """
+    def __init__(self, blob, strip_none: bool):
+        self.blob = blob
+        self.strip_none = strip_none
+
+    def mapping(self, default: Mapping, overrides: list) -> _Ref:
+        table = {}
+        for key, value, sub_overrides in lazyConfig.export._members(default, overrides):
+            if self.strip_none and value is None:
+                continue
+            table[key] = self.value(value, sub_overrides)
+        return self.record(b'd', table)
+
+    def sequence(self, sequence: Sequence) -> _Ref:
+        elements = lazyConfig.export._elements(sequence)
+        return self.record(b'l', [self.value(value, None) for _, value in elements])
+
+    def value(self, value, sub_overrides):
+        if isinstance(value, Mapping):
+            return self.mapping(value, sub_overrides or [])
+        if lazyConfig.export._is_sequence(value):
+            return self.sequence(value)
+        return value
+
+    def record(self, kind: bytes, table) -> _Ref:
+        offset = self.blob.tell()
+        payload = pickle.dumps(table, protocol=pickle.HIGHEST_PROTOCOL)
+        self.blob.write(_RECORD.pack(kind, len(payload)))
+        self.blob.write(payload)
+        return _Ref(offset)
+
+def _read_record(buf, offset: int):
+    _, length = _RECORD.unpack_from(buf, offset)
+    start = offset + _RECORD.size
+    return pickle.loads(buf[start:start + length])
+
+def _node(buf, offset: int) -> Union[SharedView, SharedListView]:
+    """ view of the record at offset, decoded on first access """
+    kind, _ = _RECORD.unpack_from(buf, offset)
+    if kind == b'l':
+        return SharedListView(buf, offset)
+    return SharedView(buf, offset)
+
+def _as_primitive(value):
+    if isinstance(value, (SharedView, SharedListView)):
+        return value.as_primitive()
+    return value
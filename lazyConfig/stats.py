@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+""" hooks observing how a configuration is loaded and accessed
+
+A hook is a callable `hook(event, **info)` passed to from_path(hooks=[...]).
+Events:
+
+- 'scan': a directory was listed, info: path
+- 'parse': a file was read and parsed (not for hits of the ParseCache), info:
+  path, extension, seconds
+- 'lookup': LazyDict.__getitem__ or LazyList.__getitem__ (with an index),
+  info: path (of the directory or list), key, hit (whether the value was loaded
+  already, in LazyMode.BOUNDED whether it was found in the bounded cache)
+- 'resolve': a Config resolved a key through its layers, info: path (tuple
+  of keys from the root), layers (number of layers consulted)
+
+Without hooks nothing is recorded, the only cost is checking for an empty tuple.
+"""
+
+from typing import Callable, Tuple
+from collections import Counter
+import threading
+
+Hook = Callable[..., None]
+
+
+def emit(hooks: Tuple[Hook, ...], event: str, **info):
+    for hook in hooks:
+        hook(event, **info)
+
+
+class Stats:
+    """ hook aggregating the events, see Config.stats() """
+    def __init__(self):
+        self._lock = threading.Lock() # events come from loader threads as well
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.files_parsed = Counter() # extension -> number of files
+            self.parse_time = {} # path -> seconds spent parsing it
+            self.cache_hits = 0
+            self.cache_misses = 0
+            self.dirs_scanned = 0
+            self.layers_consulted = {} # dotted key path -> layers of its last lookup
+
+    def __call__(self, event: str, **info):
+        with self._lock:
+            if event == 'parse':
+                self.files_parsed[info['extension']] += 1
+                path = info['path']
+                self.parse_time[path] = self.parse_time.get(path, 0.0) + info['seconds']
+            elif event == 'lookup':
+                if info['hit']:
+                    self.cache_hits += 1
+                else:
+                    self.cache_misses += 1
+            elif event == 'scan':
+                self.dirs_scanned += 1
+            elif event == 'resolve':
+                self.layers_consulted['.'.join(map(str, info['path']))] = info['layers']
+
+    def as_dict(self) -> dict:
+        """ snapshot of the statistics """
+        with self._lock:
+            return {
+                'files_parsed': dict(self.files_parsed),
+                'parse_time': dict(self.parse_time),
+                'cache_hits': self.cache_hits,
+                'cache_misses': self.cache_misses,
+                'dirs_scanned': self.dirs_scanned,
+                'layers_consulted': dict(self.layers_consulted),
+            }
+
+    def __repr__(self):
+        return (f"Stats(files_parsed={sum(self.files_parsed.values())}, "
+                f"dirs_scanned={self.dirs_scanned}, cache_hits={self.cache_hits}, "
+                f"cache_misses={self.cache_misses})")
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+""" where the files of a configuration tree are read from
+
+LazyDict and LazyList only access their tree through a storage: FileStorage
+for directories on disk, ZipStorage for a tree packed into a single zip
+archive (see lazyConfig.from_archive()) and KVStorage for a key-value service
+(see lazyConfig.kvStorage).
+"""
+
+from typing import NamedTuple, Optional, Tuple, TextIO
+import os, io, sys, mmap, zipfile, posixpath
+
+
+class DirManifest(NamedTuple):
+    """ result of a single scan of a directory
+
+    entries: filenames (stripped of their extension) with a known extension
+        mapped to their extension, names of subdirectories mapped to None
+    size: total number of entries in the directory
+    mtime: modification time of the directory (ns) before it was scanned
+    """
+    entries: dict
+    size: int
+    mtime: int = 0
+
+
+# scandir of an opened directory, its modification time is known without another stat
+_SCANDIR_FD = os.scandir in os.supports_fd and hasattr(os, 'O_DIRECTORY')
+
+
+def scan_dir(dir_path: str, extensions) -> DirManifest:
+    """ scan the directory once, using the file types cached by os.scandir
+    instead of a stat call per entry
+
+    Example:
+        extensions: ['.txt']
+        dir: file1.txt, file2.py, subdir
+        -> Output: DirManifest(entries={'file1' : '.txt', 'subdir': None}, size=3, mtime=...)
+
+    names of directories map to None to differentiate it from files with no
+    extension i.e. ''. Where scandir accepts file descriptors the modification
+    time is taken from the opened directory instead of another stat of the path.
+    """
+    if not _SCANDIR_FD:
+        mtime = os.stat(dir_path).st_mtime_ns
+        with os.scandir(dir_path) as it:
+            return _manifest(((entry.name, entry.is_dir()) for entry in it), extensions, mtime)
+    fd = os.open(dir_path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        mtime = os.fstat(fd).st_mtime_ns
+        with os.scandir(fd) as it:
+            return _manifest(((entry.name, entry.is_dir()) for entry in it), extensions, mtime)
+    finally:
+        os.close(fd)
+
+def _manifest(listing, extensions, mtime: int) -> DirManifest:
+    """ DirManifest of the (name, is directory) pairs of a directory """
+    entries = {}
+    size = 0
+    for filename, is_dir in listing:
+        size += 1
+        name, extension = os.path.splitext(filename)
+        name = sys.intern(name) # the same names recur across directories and processes
+        if extension == '' and is_dir:
+            entries[name] = None
+        elif extension in extensions:
+            entries[name] = extension
+    return DirManifest(entries, size, mtime)
+
+
+class FileStorage:
+    """ directories and files on disk """
+    __slots__ = ()
+
+    join = staticmethod(os.path.join)
+
+    def scan(self, path: str, extensions) -> DirManifest:
+        return scan_dir(path, extensions)
+
+    def open(self, path: str) -> TextIO:
+        return open(path, 'r')
+
+    def map(self, path: str):
+        """ read only memory map of the file, None if it is empty """
+        with open(path, 'rb') as mapped_file:
+            if os.fstat(mapped_file.fileno()).st_size == 0:
+                return None
+            return mmap.mmap(mapped_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def mtime(self, path: str) -> int:
+        return os.stat(path).st_mtime_ns
+
+    def signature(self, path: str) -> Optional[Tuple[int, int]]:
+        """ (modification time, size) of the file, None if it does not exist """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat_signature(stat)
+
+    def opened_signature(self, stream: TextIO, path: str) -> Tuple[int, int]:
+        """ signature of a file returned by open, without another stat of the path """
+        return stat_signature(os.fstat(stream.fileno()))
+
+    def prefetch(self, paths):
+        """ nothing to batch, files are read when they are opened """
+
+    def __repr__(self):
+        return "FileStorage()"
+
+FILE_STORAGE = FileStorage()
+
+def stat_signature(stat: os.stat_result) -> Tuple[int, int]:
+    """ FileStorage.signature of the file with the given stat """
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class ZipStorage:
+    """ read only tree inside a zip archive, paths are relative to its root
+    ('' is the root, 'database/connection.yml' a file)
+
+    The central directory of the archive is read once on construction, scanning
+    a directory is a dictionary lookup afterwards. The archive is expected not to
+    change while it is open: modification times are those of the archive.
+    """
+    __slots__ = ('archive', '_zip', '_dirs', '_files', '_mtime')
+
+    join = staticmethod(posixpath.join)
+
+    def __init__(self, archive: str):
+        self.archive = archive
+        self._zip = zipfile.ZipFile(archive)
+        self._mtime = os.stat(archive).st_mtime_ns
+        self._dirs = {'': {}} # directory -> {name: is directory}
+        self._files = {} # path -> ZipInfo
+        for info in self._zip.infolist():
+            path = info.filename.rstrip('/')
+            if not path:
+                continue
+            if not info.is_dir():
+                self._files[path] = info
+            self._add(path, info.is_dir())
+
+    def _add(self, path: str, is_dir: bool):
+        """ register path and its (implicit) parent directories """
+        parent, name = posixpath.split(path)
+        if is_dir:
+            self._dirs.setdefault(path, {})
+        siblings = self._dirs.get(parent)
+        if siblings is None:
+            self._add(parent, True)
+            siblings = self._dirs[parent]
+        siblings[name] = is_dir or siblings.get(name, False)
+
+    def scan(self, path: str, extensions) -> DirManifest:
+        try:
+            listing = self._dirs[path]
+        except KeyError:
+            raise FileNotFoundError(f'{path} is not a directory in {self.archive}') from None
+        return _manifest(listing.items(), extensions, self._mtime)
+
+    def open(self, path: str) -> TextIO:
+        try:
+            return io.TextIOWrapper(self._zip.open(self._files[path]), encoding='utf-8')
+        except KeyError:
+            raise FileNotFoundError(f'{path} does not exist in {self.archive}') from None
+
+    def map(self, path: str):
+        """ contents of the member (read into memory, members can be compressed) """
+        try:
+            return self._zip.read(self._files[path]) or None
+        except KeyError:
+            raise FileNotFoundError(f'{path} does not exist in {self.archive}') from None
+
+    def mtime(self, path: str) -> int:
+        return self._mtime
+
+    def signature(self, path: str) -> Optional[Tuple[int, int]]:
+        info = self._files.get(path)
+        if info is None:
+            return None
+        return (info.CRC, info.file_size)
+
+    def opened_signature(self, stream: TextIO, path: str) -> Optional[Tuple[int, int]]:
+        return self.signature(path)
+
+    def prefetch(self, paths):
+        """ nothing to batch, members are read when they are opened """
+
+    def close(self):
+        self._zip.close()
+
+    def __repr__(self):
+        return f"ZipStorage(archive='{self.archive}')"
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Watcher:
+    """ background thread calling refresh() on a Config periodically """
+    def __init__(self, config, interval: float = 1.0, callback = None):
+        self.config = config
+        self.interval = interval
+        self.callback = callback
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name='lazyConfig-watcher', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                changed = self.config.refresh()
+            except Exception: # keep watching, files might be in the middle of an update
+                logger.exception('refreshing the configuration failed')
+                continue
+            if changed and self.callback is not None:
+                self.callback(self.config)
+
+    def stop(self, timeout: float = None):
+        """ stop watching and wait for the thread to finish """
+        self._stopped.set()
+        self._thread.join(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def __repr__(self):
+        return f"Watcher(interval={self.interval}, running={self._thread.is_alive()})"
@@ -22,7 +22,10 @@ setup(name='lazyConfig',
       python_requires='>=3.8',
       install_requires=[
             'pyYAML>=5.3.1<6',
-            'toml>=0.10.1<1',
+            'toml>=0.10.1<1; python_version < "3.11"',
             'deprecation>=2.1<3'
-      ]
+      ],
+      extras_require={
+            'fast': ['orjson']
+      }
      )
\ No newline at end of file
@@ -0,0 +1,31 @@
+import io, json, yaml
+
+import lazyConfig
+from lazyConfig import LazyMode
+
+def test_iter_items():
+    cfg = lazyConfig.from_path('tests/config_default', ['tests/config'])
+    items = dict(cfg.iter_items())
+    assert items['database.connection.hosts.0.host'] == 'myElasticsearchServer'
+    assert items['database.configuration.indices.index2'] == 'stayIndex'
+    assert items['list.0'] == 'haha' and 'list.1' not in items
+    assert not cfg._config._loaded(), 'iter_items kept loaded files'
+
+def test_dump():
+    for laziness in LazyMode:
+        cfg = lazyConfig.from_path('tests/config_default', ['tests/config'], laziness=laziness)
+        expected = lazyConfig.from_path('tests/config_default', ['tests/config']).as_dict()
+
+        for indent in (None, 2):
+            out = io.StringIO()
+            cfg.dump_json(out, indent=indent)
+            assert json.loads(out.getvalue()) == expected
+
+        out = io.StringIO()
+        cfg.dump_yaml(out)
+        assert yaml.safe_load(out.getvalue()) == expected
+        assert isinstance(cfg._config, lazyConfig.LazyDict), 'lazy structure was replaced'
+
+    out = io.StringIO()
+    lazyConfig.dump_json(lazyConfig.from_primitive({'empty': {}, 'list': [], 'none': None}), out)
+    assert json.loads(out.getvalue()) == {'empty': {}, 'list': []}
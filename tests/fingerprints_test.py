@@ -0,0 +1,88 @@
+import os, shutil
+
+import lazyConfig
+from lazyConfig import LazyMode, MISSING
+
+def _copy(tmp_path, name):
+    shutil.copytree('tests/config_default', tmp_path / name)
+    return tmp_path / name
+
+def test_fingerprint_unchanged(tmp_path):
+    deployed = lazyConfig.from_path(str(_copy(tmp_path, 'deployed')), ['tests/config'])
+    candidate = lazyConfig.from_path(str(_copy(tmp_path, 'candidate')), ['tests/config'])
+    assert deployed.fingerprint() == candidate.fingerprint()
+    assert deployed == candidate and deployed.diff(candidate) == {}
+    assert deployed._config._unloaded(), 'comparing equal trees should not parse files'
+    assert deployed.list == candidate.list
+
+def test_diff(tmp_path):
+    deployed = lazyConfig.from_path(str(_copy(tmp_path, 'deployed')), ['tests/config'])
+    root = _copy(tmp_path, 'candidate')
+    (root / 'app.yml').write_text("primary_color: red\nsecondary_color: 'green'")
+    (root / 'new.yml').write_text("key: value")
+    candidate = lazyConfig.from_path(str(root), ['tests/config'], laziness=LazyMode.LAZY)
+    assert deployed != candidate
+    assert deployed.diff(candidate) == {
+        'new': (MISSING, candidate.new),
+    }, 'the override of app.primary_color hides the change'
+
+    (root / 'list' / '1.yml').write_text("zeroKey: changed")
+    default = lazyConfig.from_path(str(tmp_path / 'deployed'))
+    changed = lazyConfig.from_path(str(root))
+    assert changed.diff(default) == {
+        'app.primary_color': ('red', 'blue'),
+        'list.1.zeroKey': ('changed', MISSING),
+        'list.1.oneKey': (MISSING, 'oneValue'),
+        'new': (changed.new, MISSING),
+    }
+    assert changed.database == default.database
+
+def test_fingerprint_refresh(tmp_path):
+    root = _copy(tmp_path, 'config')
+    cfg = lazyConfig.from_path(str(root))
+    before = cfg.fingerprint()
+    (root / 'app.yml').write_text("primary_color: red")
+    os.utime(root / 'app.yml', ns=(0, os.stat(root / 'app.yml').st_mtime_ns + 10**9))
+    assert cfg.fingerprint() == before, 'fingerprints are kept until refresh'
+    assert cfg.refresh() is True
+    assert cfg.fingerprint() != before
+
+def test_fingerprint_loaded(tmp_path):
+    root = _copy(tmp_path, 'config')
+    for laziness in (LazyMode.CACHED, LazyMode.BOUNDED):
+        deployed = lazyConfig.from_path(str(root), laziness=laziness)
+        assert deployed.app.primary_color == 'blue' and deployed.list[1].oneKey == 'oneValue'
+        (root / 'app.yml').write_text("primary_color: red\nsecondary_color: green")
+        (root / 'list' / '1.yml').write_text("oneKey: changed")
+        for path in (root / 'app.yml', root / 'list' / '1.yml'):
+            os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+        candidate = lazyConfig.from_path(str(root), laziness=laziness)
+        assert deployed != candidate and deployed.list != candidate.list
+        assert deployed.diff(candidate) == {
+            'app.primary_color': ('blue', 'red'), 'list.1.oneKey': ('oneValue', 'changed')}
+        assert deployed.refresh() is True
+        assert deployed == candidate
+        shutil.rmtree(root)
+        _copy(tmp_path, 'config')
+
+    def other_load(stream):
+        return {'primary_color': 'other', 'secondary_color': 'green'}
+    default = lazyConfig.from_path(str(root))
+    other = lazyConfig.from_path(str(root), custom_extension_loader={'.yml': other_load})
+    assert default.fingerprint() != other.fingerprint()
+    assert default.diff(other)['app.primary_color'] == ('blue', 'other')
+
+def test_diff_child_overrides(tmp_path):
+    a = lazyConfig.from_path(str(_copy(tmp_path, 'a')), ['tests/config'])
+    b = lazyConfig.from_path(str(_copy(tmp_path, 'b')), ['tests/config'])
+    assert a == b
+    a.database.add_override({'connection': {'timeout': 1}})
+    assert a != b
+    assert a.diff(b) == {'database.connection.timeout': (1, 42)}
+
+    a = lazyConfig.from_path(str(tmp_path / 'a'))
+    b = lazyConfig.from_path(str(tmp_path / 'b'))
+    assert a == b and a.list == b.list
+    a.list[1].add_override({'oneKey': 'changed'})
+    assert a != b and a.list != b.list
+    assert a.diff(b) == {'list.1.oneKey': ('changed', 'oneValue')}
@@ -0,0 +1,135 @@
+import os, json, base64, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, unquote
+
+import pytest
+
+import lazyConfig
+from lazyConfig import LazyMode
+
+
+class KVServer(ThreadingHTTPServer):
+    """ in-process stand in for the key-value endpoints of Consul """
+    daemon_threads = True
+
+    def __init__(self, kv: dict):
+        super().__init__(('127.0.0.1', 0), KVHandler)
+        self.kv = {key: (1, value) for key, value in kv.items()} # key -> (modify index, value)
+        self.index = 1
+        self.requests = []
+        self.connections = 0
+
+    def put(self, key: str, value: bytes):
+        self.index += 1
+        self.kv[key] = (self.index, value)
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+class KVHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1' # keep alive
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body, index: int = 0):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('X-Consul-Index', str(index))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _entry(self, key):
+        index, value = self.server.kv[key]
+        return {'Key': key, 'Value': base64.b64encode(value).decode() or None,
+                'ModifyIndex': index}
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        key = unquote(url.path[len('/v1/kv/'):])
+        self.server.requests.append(('GET', key, url.query))
+        kv = self.server.kv
+        if url.query == 'keys&separator=/':
+            below = [k for k in kv if k.startswith(key)]
+            if not below:
+                return self._send(404, None)
+            listing = {key + k[len(key):].split('/', 1)[0] + ('/' if '/' in k[len(key):] else '')
+                       for k in below}
+            return self._send(200, sorted(listing), max(kv[k][0] for k in below))
+        if key not in kv:
+            return self._send(404, None)
+        self._send(200, [self._entry(key)])
+
+    def do_PUT(self):
+        operations = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        keys = [operation['KV']['Key'] for operation in operations]
+        self.server.requests.append(('PUT', keys, ''))
+        if any(key not in self.server.kv for key in keys):
+            return self._send(409, {'Errors': [{'What': 'key not found'}]})
+        self._send(200, {'Results': [{'KV': self._entry(key)} for key in keys]})
+
+
+def _tree(directory, prefix):
+    kv = {}
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                kv[prefix + '/' + os.path.relpath(path, directory).replace(os.sep, '/')] = f.read()
+    return kv
+
+@pytest.fixture
+def server():
+    kv = _tree('tests/config_default', 'config')
+    kv.update(_tree('tests/config', 'override'))
+    server = KVServer(kv)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_from_kv(server):
+    expected = lazyConfig.from_path('tests/config_default', ['tests/config']).as_dict()
+    cfg = lazyConfig.from_kv(server.url, 'config', ['override'])
+    assert cfg.database.connection.hosts[0].host == 'myElasticsearchServer'
+    assert cfg._config._unloaded(), 'accessing one key loaded everything'
+    assert cfg.as_dict() == expected
+    for laziness in LazyMode:
+        assert lazyConfig.from_kv(server.url, 'config', ['override'], laziness).as_dict() == expected
+
+def test_kv_batches_and_pools(server):
+    cfg = lazyConfig.from_kv(server.url, 'config', ['override'], pool_size=2)
+    server.requests.clear()
+    cfg.force_load()
+    fetches = [keys for method, keys, _ in server.requests if method == 'PUT']
+    assert max(map(len, fetches)) > 1, 'files of a directory should be read together'
+    directories = sum(1 for method, _, query in server.requests if query)
+    assert len(fetches) <= directories
+    assert server.connections == 1, 'sequential requests should reuse one connection'
+
+    storage = lazyConfig.KVStorage(server.url, batch_size=2)
+    paths = sorted(key for key in server.kv if key.startswith('config/'))
+    server.requests.clear()
+    storage.prefetch(paths)
+    storage.prefetch(paths)
+    assert len(server.requests) == (len(paths) + 1) // 2
+    assert storage.map(paths[0]) == server.kv[paths[0]][1]
+    assert len(server.requests) == (len(paths) + 1) // 2, 'responses should be cached'
+
+def test_kv_refresh(server):
+    cfg = lazyConfig.from_kv(server.url, 'config', [])
+    assert cfg.app.primary_color == 'blue'
+    assert not cfg.refresh()
+    server.put('config/app.yml', b"primary_color: red")
+    assert cfg.refresh() is True
+    assert cfg.app.primary_color == 'red'
+    with pytest.raises(FileNotFoundError):
+        lazyConfig.from_kv(server.url, 'missing')
@@ -0,0 +1,56 @@
+import os, shutil
+
+import yaml
+
+import lazyConfig
+from lazyConfig import ParseCache
+
+def test_parse_cache(tmp_path):
+    config_dir = tmp_path / 'config'
+    shutil.copytree('tests/config_default', config_dir)
+    cache_dir = str(tmp_path / 'cache')
+
+    cold = lazyConfig.from_path(str(config_dir), cache_dir=cache_dir)
+    expected = cold.as_dict()
+    assert os.listdir(cache_dir), 'nothing was cached'
+
+    warm = lazyConfig.from_path(str(config_dir), cache_dir=cache_dir)
+    cache = warm._config._parse_cache
+    assert warm.as_dict() == expected
+    assert cache.misses == 0 and cache.hits > 0, 'warm cache was not used'
+
+    # stale entries are detected
+    (config_dir / 'app.yml').write_text("primary_color: 'red'\nsecondary_color: 'green'")
+    assert lazyConfig.from_path(str(config_dir), cache_dir=cache_dir).app.primary_color == 'red'
+
+def test_parse_cache_eviction(tmp_path):
+    cache = ParseCache(str(tmp_path / 'cache'), max_size=1)
+    cache.load('tests/config_default/app.yml', lazyConfig.lazyData.DEFAULT_EXTENSION_MAP['.yml'])
+    assert cache._size <= 1
+    assert not os.listdir(tmp_path / 'cache')
+
+def test_parse_cache_loaders(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    def make(prefix):
+        def load(stream):
+            data = yaml.safe_load(stream)
+            return {**data, 'primary_color': prefix + data['primary_color']} if (
+                'primary_color' in data) else data
+        return load
+    for prefix in ('A-', 'B-'): # same __qualname__, no cache_key: not cached
+        cfg = lazyConfig.from_path(
+            'tests/config_default', custom_extension_loader={'.yml': make(prefix)},
+            cache_dir=cache_dir)
+        assert cfg.app.primary_color == prefix + 'blue'
+        assert cfg._config._parse_cache.hits == 0
+
+    for prefix in ('A-', 'B-', 'A-'):
+        loader = make(prefix)
+        loader.cache_key = prefix
+        cfg = lazyConfig.from_path(
+            'tests/config_default', custom_extension_loader={'.yml': loader},
+            cache_dir=cache_dir)
+        assert cfg.app.primary_color == prefix + 'blue'
+    assert cfg._config._parse_cache.hits > 0
+    assert lazyConfig.loader_key(lazyConfig.lazyData.DEFAULT_EXTENSION_MAP['.yml']) == (
+        '.yml:' + lazyConfig.active_backend('.yml'))
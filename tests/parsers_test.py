@@ -0,0 +1,40 @@
+import pytest, yaml
+
+import lazyConfig
+from lazyConfig.lazyData import DEFAULT_EXTENSION_MAP
+
+def test_backend_selection():
+    assert lazyConfig.active_backend('.yml') in ('libyaml', 'pyyaml'), 'default yaml is not safe'
+    assert 'json' in lazyConfig.available_backends('.json')
+
+    previous = lazyConfig.active_backend('.yml')
+    try:
+        lazyConfig.select_backend('.yml', 'pyyaml-unsafe')
+        assert DEFAULT_EXTENSION_MAP['.yml'] is yaml.unsafe_load
+        assert lazyConfig.active_backends()['.yml'] == 'pyyaml-unsafe'
+    finally:
+        lazyConfig.select_backend('.yml', previous)
+
+    with pytest.raises(ValueError):
+        lazyConfig.select_backend('.yml', 'not-a-backend')
+
+def test_backends_agree(tmp_path):
+    json_path = tmp_path / 'data.json'
+    json_path.write_text(
+        '{"list": [1, 2.5, "three", null, true], "nested": {"inf": Infinity},'
+        ' "big": 123456789012345678901234567890}')
+    for ext, path in [('.yml', 'tests/config_default/app.yml'),
+                      ('.toml', 'tests/config_toml/__config__.toml'),
+                      ('.json', str(json_path))]:
+        results = []
+        for name in lazyConfig.available_backends(ext):
+            if name == 'partial': # lazy views, only parses what is accessed
+                continue
+            with open(path, 'r') as f:
+                results.append(lazyConfig.parsers._BACKENDS[ext][name](f))
+        assert all(result == results[0] for result in results), f'{ext} backends disagree'
+
+def test_safe_default(tmp_path):
+    (tmp_path / '__config__.yml').write_text('obj: !!python/object/apply:os.getcwd []')
+    with pytest.raises(yaml.YAMLError):
+        lazyConfig.from_path(str(tmp_path))
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+import lazyConfig
+from lazyConfig import JSONView, JSONListView, PartialJSONLoader
+from lazyConfig.partialJson import open_json
+
+DATA = {
+    'lookup': {'some_key': 'value', 'tricky "key"': '{[,]}', 'empty': {}, 'none': None},
+    'numbers': [1, -2.5, 3e3, [], [{'nested': True}]],
+    'text': 'escaped \\" quote, brackets } ] and unicode ä',
+}
+
+def test_partial_json(tmp_path):
+    path = tmp_path / 'data.json'
+    path.write_text(json.dumps(DATA, indent=2))
+    view = open_json(str(path))
+    assert isinstance(view, JSONView)
+    assert view['lookup']['some_key'] == 'value'
+    assert view['lookup']._index is not None and view['numbers']._index is None, (
+        'unused values were indexed')
+    assert isinstance(view['numbers'], JSONListView)
+    assert view['numbers'][-1][0]['nested'] is True
+    assert view['numbers'][0, -2, 1] == [1, [], -2.5]
+    for idx in (5, -6):
+        with pytest.raises(IndexError):
+            view['numbers'][idx]
+    assert view == DATA and view.as_dict() == DATA
+
+    config_dir = tmp_path / 'config'
+    config_dir.mkdir()
+    (config_dir / 'data.json').write_text(json.dumps(DATA))
+    config = lazyConfig.from_path(str(config_dir), custom_extension_loader={
+        '.json': PartialJSONLoader(threshold=0)
+    })
+    assert config.data.lookup['tricky "key"'] == '{[,]}'
+    assert config.data.numbers[4][0].nested is True
+    assert config.data.numbers[0, 1] == [1, -2.5]
+    assert config.compile().data.numbers.as_list() == DATA['numbers']
+    assert config.as_dict(strip_none=False) == {'data': DATA}
+
+def test_partial_json_parse_cache(tmp_path):
+    config_dir = tmp_path / 'config'
+    config_dir.mkdir()
+    (config_dir / 'data.json').write_text(json.dumps(DATA))
+    options = dict(
+        custom_extension_loader={'.json': PartialJSONLoader(threshold=0)},
+        cache_dir=str(tmp_path / 'cache')
+    )
+    assert lazyConfig.from_path(str(config_dir), **options).data.text == DATA['text']
+    warm = lazyConfig.from_path(str(config_dir), **options)
+    view = warm._config['data']
+    assert warm._config._parse_cache.hits == 1
+    assert view._index is not None, 'index was not restored from the cache'
+    assert warm.data.lookup.some_key == 'value'
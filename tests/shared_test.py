@@ -0,0 +1,36 @@
+import os, datetime
+
+import lazyConfig
+
+def test_publish_attach(tmp_path):
+    cfg = lazyConfig.from_path('tests/config_default', ['tests/config'])
+    blob = str(tmp_path / 'config.blob')
+    cfg.publish(blob)
+    assert cfg._config._unloaded(), 'publish loaded the configuration'
+
+    attached = lazyConfig.attach(blob)
+    assert attached.database.connection.hosts[0].host == 'myElasticsearchServer'
+    assert attached._config._children.keys() == {'database'}, 'decoded more than accessed'
+    hosts = attached.database.connection.hosts
+    assert [host.host for host in hosts[-1, 0]] == [hosts[-1].host, hosts[0].host]
+    assert attached.list[0, -1, 0] == [cfg.list[0], cfg.list[-1], cfg.list[0]]
+    expected = lazyConfig.from_path('tests/config_default', ['tests/config']).as_dict()
+    assert attached.as_dict() == expected
+
+    lazyConfig.publish(lazyConfig.from_primitive({'when': datetime.date(2020, 1, 2)}), blob)
+    assert lazyConfig.attach(blob).when == datetime.date(2020, 1, 2)
+    assert os.listdir(tmp_path) == ['config.blob']
+
+def test_attach_forked_workers(tmp_path):
+    import multiprocessing
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        return
+    blob = str(tmp_path / 'config.blob')
+    lazyConfig.from_path('tests/config_default', ['tests/config']).publish(blob)
+    context = multiprocessing.get_context('fork')
+    with context.Pool(2) as pool:
+        hosts = pool.map(_worker_host, [blob, blob])
+    assert hosts == ['myElasticsearchServer'] * 2
+
+def _worker_host(blob):
+    return lazyConfig.attach(blob).database.connection.hosts[0].host
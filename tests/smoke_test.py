@@ -2,7 +2,7 @@ import pytest
 
 import lazyConfig
 from lazyConfig import Config, ConfigList, LazyMode
-import os, yaml, json, toml
+import os, sys, yaml, json, toml, threading
 
 def test_createConfig():
     cfg = Config.from_path('tests/config_default')
@@ -112,4 +112,431 @@ def test_lists():
 def test_toml():
     config = lazyConfig.from_path('tests/config_toml')
     with open('tests/config_toml/__config__.toml', 'r') as f:
-        assert config == toml.loads(f.read())
\ No newline at end of file
+        assert config == toml.loads(f.read())
+
+def test_memoization():
+    cfg = lazyConfig.from_path('tests/config_default', ['tests/config'])
+    assert cfg.database is cfg.database, 'children are not memoized'
+    assert cfg.database.connection.hosts[0] is cfg.database.connection.hosts[0]
+
+    database = cfg.database
+    cfg.add_override({'database': {'connection': {'timeout': 1}}})
+    assert cfg.database is not database, 'add_override did not invalidate'
+    assert cfg.database.connection.timeout == 1
+
+    cfg.force_load()
+    assert cfg.database.connection.timeout == 1
+
+    lazy = lazyConfig.from_path('tests/config_default', laziness=LazyMode.LAZY)
+    assert lazy.database is not lazy.database, 'LazyMode.LAZY should not be memoized'
+
+def test_compile():
+    cfg = lazyConfig.from_path('tests/config_default', ['tests/config'])
+    compiled = cfg.compile()
+
+    assert compiled == cfg, 'compiled snapshot differs'
+    assert compiled.database.connection.hosts[0].host == 'myElasticsearchServer'
+    assert compiled['database.connection.hosts.0.host'] == 'myElasticsearchServer'
+    assert compiled.database['connection.timeout'] == 42
+    assert compiled.as_dict() == cfg.as_dict()
+
+    with pytest.raises(AttributeError):
+        compiled.not_a_key
+    with pytest.raises(TypeError):
+        compiled['version'] = 0
+
+    cfg.add_override({'version': 0})
+    assert compiled.version == 42, 'snapshot should be frozen'
+    assert lazyConfig.compile(cfg).version == 0
+
+def test_compile_frozen():
+    cfg = lazyConfig.from_path('tests/config_default', ['tests/config'])
+    cfg.add_override({'app': {'secondary_color': None}}, none_can_override=True)
+    frozen = cfg.compile(frozen=True)
+    view = frozen.as_dict()
+    assert view is frozen.as_dict(), 'views should be built once'
+    assert view['database'] is frozen.database.as_dict()
+    assert frozen == cfg.compile() and view['list'] == ('haha',)
+    assert 'secondary_color' not in view['app']
+    assert frozen.as_primitive()['app']['secondary_color'] is None
+    assert isinstance(view['database']['connection']['hosts'], tuple)
+    with pytest.raises(TypeError):
+        view['version'] = 0
+    assert hash(frozen) == hash(cfg.compile(frozen=True))
+    assert {frozen.database: 'database'}[cfg.compile().database] == 'database'
+
+def test_scan_dir(monkeypatch):
+    from lazyConfig.lazyData import scan_dir, manifest_is_lazyList, DEFAULT_EXTENSION_MAP
+    mtime = os.stat('tests/config_default').st_mtime_ns
+    stats = []
+    stat = os.stat
+    monkeypatch.setattr(
+        os, 'stat', lambda *args, **kwargs: stats.append(args) or stat(*args, **kwargs))
+    manifest = scan_dir('tests/config_default', DEFAULT_EXTENSION_MAP.keys())
+    monkeypatch.undo()
+    if lazyConfig.storage._SCANDIR_FD:
+        assert stats == [], 'the directory was stat-ed besides listing it'
+    assert manifest.mtime == mtime
+    assert manifest.entries == {
+        '__config__': '.yml', 'app': '.yml', 'database': None, 'list': None}
+    assert manifest.size == 4
+    assert manifest_is_lazyList('tests/config_default', manifest, ['.yml']) is None
+
+    list_manifest = scan_dir('tests/config_default/list', ['.yml'])
+    assert manifest_is_lazyList('tests/config_default/list', list_manifest, ['.yml']) == ('.yml', 2)
+
+def test_parallel_load():
+    sequential = lazyConfig.from_path('tests/config_default', ['tests/config']).as_dict()
+    for laziness in LazyMode:
+        parallel = lazyConfig.from_path(
+            'tests/config_default', ['tests/config'], laziness=laziness)
+        assert parallel.as_dict(workers=4) == sequential, f'{laziness} differs'
+
+    lazy_dict = lazyConfig.LazyDict('tests/config_default')
+    lazy_dict.force_load(workers=4)
+    assert not lazy_dict._unloaded()
+    assert list(lazy_dict) == list(lazyConfig.LazyDict('tests/config_default', LazyMode.EAGER))
+
+def test_async():
+    import asyncio
+    calls = []
+    def counting_load(stream):
+        calls.append(stream.name)
+        return yaml.safe_load(stream)
+
+    async def main():
+        cfg = await lazyConfig.afrom_path(
+            'tests/config_default', ['tests/config'],
+            custom_extension_loader={'.yml': counting_load})
+        calls.clear()
+        apps = await asyncio.gather(*(cfg.aget('app') for _ in range(10)))
+        assert all(app is apps[0] for app in apps)
+        assert apps[0].primary_color == 'pink'
+        assert calls == ['tests/config_default/app.yml'], 'concurrent loads were not shared'
+
+        database = await cfg.aget('database')
+        hosts = await (await database.aget('connection')).aget('hosts')
+        assert (await hosts.aget(0)).host == 'myElasticsearchServer'
+
+        await cfg.aforce_load(workers=2)
+        assert cfg.list[0] == 'haha'
+
+    asyncio.run(main())
+
+def test_lazy_list_modes(tmp_path):
+    from lazyConfig.lazyData import LRUCache
+    for idx in range(5):
+        (tmp_path / f'{idx}.json').write_text(json.dumps({'idx': idx}))
+    calls = []
+    def counting_load(stream):
+        calls.append(stream.name)
+        return json.load(stream)
+
+    def make(laziness, max_cached=None):
+        calls.clear()
+        return lazyConfig.LazyList(str(tmp_path), 5, '.json', counting_load, laziness,
+                                   max_cached=max_cached)
+
+    cached = make(LazyMode.CACHED)
+    assert cached[-5] == {'idx': 0}
+    assert cached[0:3] == cached[(0, 1, 2)] == [{'idx': i} for i in range(3)]
+    assert list(cached) == [{'idx': i} for i in range(5)]
+    assert len(calls) == 5, 'cached elements were loaded again'
+
+    lazy = make(LazyMode.LAZY)
+    lazy[0], lazy[0]
+    assert len(calls) == 2
+
+    eager = make(LazyMode.EAGER)
+    assert len(calls) == 5
+    eager.as_list()
+    assert len(calls) == 5
+
+    bounded = make(LazyMode.CACHED, max_cached=2)
+    assert isinstance(bounded._cache, LRUCache)
+    bounded[0], bounded[1], bounded[0], bounded[2], bounded[0]
+    assert len(bounded._cache) == 2 and len(calls) == 3
+    with pytest.raises(IndexError):
+        bounded[5]
+
+def test_bounded_mode(tmp_path):
+    for idx in range(4):
+        (tmp_path / f'file{idx}.json').write_text(json.dumps({'idx': [idx] * 100}))
+    calls = []
+    def counting_load(stream):
+        calls.append(stream.name)
+        return json.load(stream)
+    def make(**limits):
+        calls.clear()
+        return lazyConfig.from_path(str(tmp_path), laziness=LazyMode.BOUNDED,
+                                    custom_extension_loader={'.json': counting_load}, **limits)
+
+    cfg = make(max_cached_entries=2)
+    cfg.file0, cfg.file1, cfg.file0
+    assert len(calls) == 2
+    cfg.file2, cfg.file3, cfg.file0
+    assert len(calls) == 5, 'least recently used entry was not evicted'
+    assert cfg.as_dict() == {f'file{idx}': {'idx': [idx] * 100} for idx in range(4)}
+
+    cfg = make(max_cached_bytes=1)
+    cfg.file0, cfg.file0
+    assert len(calls) == 2
+
+    cfg = make(max_cached_entries=1, weak_cache=True)
+    file0 = cfg.file0
+    cfg.file1, cfg.file2
+    assert cfg.file0 == file0 and len(calls) == 3, 'referenced value was loaded again'
+
+def _bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+def test_refresh(tmp_path, monkeypatch):
+    import shutil
+    shutil.copytree('tests/config_default', tmp_path / 'config')
+    root = tmp_path / 'config'
+    calls = []
+    def counting_load(stream):
+        calls.append(os.path.relpath(stream.name, root))
+        return yaml.safe_load(stream)
+    stats = []
+    signature = lazyConfig.FileStorage.signature
+    monkeypatch.setattr(lazyConfig.FileStorage, 'signature',
+                        lambda self, path: stats.append(path) or signature(self, path))
+    cfg = lazyConfig.from_path(str(root), custom_extension_loader={'.yml': counting_load})
+    assert cfg.app.primary_color == 'blue'
+    assert cfg.database.configuration.indices.index2 == 'stayIndex'
+    assert cfg.list[1].oneKey == 'oneValue'
+    assert stats == [], 'loading stat-ed the files once more'
+    assert cfg.refresh() is False, 'nothing changed'
+
+    calls.clear()
+    (root / 'app.yml').write_text("primary_color: 'red'")
+    _bump_mtime(root / 'app.yml')
+    (root / 'new.yml').write_text("key: value")
+    (root / 'list' / '2.yml').write_text("twoKey: twoValue")
+    _bump_mtime(root)
+    _bump_mtime(root / 'list')
+    assert cfg.refresh() is True
+    assert calls == [], 'refresh should not load eagerly'
+
+    assert cfg.app.primary_color == 'red'
+    assert cfg.new.key == 'value'
+    assert len(cfg.list) == 3 and cfg.list[2].twoKey == 'twoValue'
+    assert cfg.database.configuration.indices.index2 == 'stayIndex'
+    assert 'database/configuration.yml' not in calls, 'unchanged file was reloaded'
+
+    (root / 'new.yml').unlink()
+    _bump_mtime(root)
+    cfg.refresh()
+    with pytest.raises(AttributeError):
+        cfg.new
+
+    changes = []
+    with cfg.watch(interval=0.01, callback=changes.append):
+        (root / 'app.yml').write_text("primary_color: 'green'")
+        _bump_mtime(root / 'app.yml')
+        import time
+        for _ in range(200):
+            if changes:
+                break
+            time.sleep(0.01)
+    assert changes == [cfg] and cfg.app.primary_color == 'green'
+
+def test_overlay():
+    import asyncio, threading
+    cfg = lazyConfig.from_path('tests/config_default', ['tests/config'])
+    with cfg.overlay({'version': 7, 'database': {'connection': {'timeout': 1}}, 'list': [1, 2]}):
+        assert cfg.version == 7
+        assert cfg.database.connection.timeout == 1
+        assert cfg.database.connection.hosts[0].host == 'myElasticsearchServer'
+        assert cfg.list == [1, 2]
+        with cfg.database.overlay({'connection': {'timeout': 2}}) as database:
+            assert database.connection.timeout == 2
+            assert cfg.version == 7
+        assert cfg.database.connection.timeout == 1
+
+        other_thread = []
+        thread = threading.Thread(target=lambda: other_thread.append(cfg.version))
+        thread.start(); thread.join()
+        assert other_thread == [42], 'overlay leaked into another thread'
+
+        with pytest.raises(AttributeError):
+            with cfg.overlay({'not_in_default': 1}):
+                cfg.not_in_default
+    assert cfg.version == 42
+    assert cfg.database.connection.timeout == 42
+
+    async def request(version):
+        with cfg.overlay({'version': version}):
+            await asyncio.sleep(0)
+            return cfg.version
+    async def main():
+        return await asyncio.gather(*(request(v) for v in range(5)))
+    assert asyncio.run(main()) == list(range(5))
+
+    shared = cfg.overlay({'version': 1}) # e.g. prebuilt per tenant
+    async def tenant_request(delay):
+        with shared:
+            await asyncio.sleep(delay)
+            version = cfg.version
+        return version, cfg.version
+    async def tenants():
+        return await asyncio.gather(*(tenant_request(d) for d in (0.03, 0.01, 0.02)))
+    assert asyncio.run(tenants()) == [(1, 42)] * 3
+
+def test_compact_nodes():
+    root = lazyConfig.LazyDict('tests/config_default')
+    child = root['database']
+    assert child._options is root._options, 'settings are not shared by the tree'
+    assert not hasattr(child, '__dict__')
+    assert not hasattr(lazyConfig.from_path('tests/config_default').database, '__dict__')
+    key = next(iter(child))
+    assert key is sys.intern(key)
+
+def test_stats():
+    events = []
+    cfg = lazyConfig.from_path(
+        'tests/config_default', ['tests/config'], stats=True,
+        hooks=[lambda event, **info: events.append(event)])
+    assert cfg.database.connection.timeout == 42
+    cfg.database.connection
+    stats = cfg.stats()
+    assert stats['files_parsed']['.yml'] >= 2
+    assert stats['dirs_scanned'] >= 2 and stats['cache_misses'] >= 2
+    assert stats['layers_consulted']['database'] == 2
+    assert stats['layers_consulted']['database.connection.timeout'] == 1
+    assert set(events) == {'scan', 'parse', 'lookup', 'resolve'}
+    with pytest.raises(ValueError):
+        lazyConfig.from_path('tests/config_default').stats()
+
+def test_stats_caches(tmp_path):
+    for parsed in (True, False): # the second start is served by the parse cache
+        cfg = lazyConfig.from_path('tests/config_default', cache_dir=str(tmp_path), stats=True)
+        assert cfg.app.primary_color == 'blue'
+        assert bool(cfg.stats()['files_parsed']) is parsed
+
+    cfg = lazyConfig.from_path(
+        'tests/config_default', laziness=LazyMode.BOUNDED, max_cached_entries=8, stats=True)
+    assert cfg.app.primary_color == 'blue'
+    before = cfg.stats()
+    assert cfg.app.primary_color == 'blue'
+    after = cfg.stats()
+    assert after['cache_misses'] == before['cache_misses']
+    assert after['cache_hits'] > before['cache_hits']
+    assert after['files_parsed'] == before['files_parsed']
+
+def test_packed_list(tmp_path):
+    config_dir = tmp_path / 'config'
+    config_dir.mkdir()
+    rows = [{'id': idx, 'name': f'row {idx}'} for idx in range(100)]
+    (config_dir / 'rows.jsonl').write_text('\n'.join(map(json.dumps, rows)) + '\n\n')
+    cache_dir = str(tmp_path / 'cache')
+    for laziness in LazyMode:
+        cfg = lazyConfig.from_path(str(config_dir), laziness=laziness, cache_dir=cache_dir)
+        assert isinstance(cfg._config['rows'], lazyConfig.PackedList)
+        assert cfg.rows[42].name == 'row 42' and cfg.rows[-1].id == 99
+        assert len(cfg.rows) == 100 and cfg.rows.list[10:12] == rows[10:12]
+        assert cfg.as_dict() == {'rows': rows}
+
+    cfg = lazyConfig.from_path(str(config_dir), cache_dir=cache_dir)
+    assert cfg._config._parse_cache.misses == 0, 'line index was not cached'
+    assert cfg.rows[0].id == 0
+    (config_dir / 'rows.jsonl').write_text('{"id": -1}\n')
+    _bump_mtime(config_dir / 'rows.jsonl')
+    assert cfg.refresh() and cfg.rows[0].id == -1 and len(cfg.rows) == 1
+
+def test_bind():
+    cfg = lazyConfig.from_path('tests/config_default', ['tests/config'])
+    host = cfg.bind('database.connection.hosts.0.host')
+    timeout = cfg.database.bind(('connection', 'timeout'))
+    assert host.get() == 'myElasticsearchServer' and timeout() == 42
+    assert host.get() == 'myElasticsearchServer'
+    cfg.add_override({'database': {'connection': {'timeout': 1}}})
+    assert timeout.get() == 1
+    with cfg.overlay({'database': {'connection': {'timeout': 2}}}):
+        assert timeout.get() == 2
+    assert timeout.get() == 1
+
+    port = cfg.bind('database.connection.hosts.0.port')
+    element_port = cfg.database.connection.hosts[0].bind('port')
+    assert port.get() == 9200 and element_port.get() == 9200
+    cfg.database.connection.hosts[0].add_override({'port': 1})
+    assert port.get() == 1 and element_port.get() == 1, 'binding into a list element is stale'
+
+def test_select():
+    cfg = lazyConfig.from_path('tests/config_default', ['tests/config'])
+    patterns = ['database.connection.*', 'database.configuration.indices.index?',
+                'database.connection.hosts.0.host', 'list.0', 'version']
+    expected = {
+        'version': 42,
+        'database.connection.hosts': cfg.database.connection.hosts,
+        'database.connection.hosts.0.host': 'myElasticsearchServer',
+        'database.connection.timeout': 42,
+        'database.configuration.indices.index1': 'overridden index',
+        'database.configuration.indices.index2': 'stayIndex',
+        'list.0': 'haha',
+    }
+    fresh = lazyConfig.from_path('tests/config_default', ['tests/config'])
+    assert fresh.select(patterns, workers=2) == expected
+    assert lazyConfig.select(cfg, patterns) == expected
+    with pytest.raises(KeyError):
+        cfg.select(['database.connection.missing'])
+
+    mixed = lazyConfig.from_primitive({'database': {
+        'primary': {'host': 'a', 'port': 1}, 'pool': {'size': 3}, 'replica': {'host': 'b'},
+        'name': 'db'}})
+    assert mixed.select(['database.*.host', 'database.*.port']) == {
+        'database.primary.host': 'a', 'database.primary.port': 1, 'database.replica.host': 'b'}
+    selected = mixed.select(['database.replica', 'database.primary.*', 'database.name'])
+    assert list(selected) == [
+        'database.primary.host', 'database.primary.port', 'database.replica', 'database.name'
+    ], 'not in the order of the configuration'
+    with pytest.raises(KeyError):
+        mixed.select(['database.pool.host'])
+
+def test_prefetch_profile(tmp_path):
+    cfg = lazyConfig.from_path('tests/config_default', record_profile=True)
+    assert cfg.database.connection.timeout == 10 and cfg.list[1].oneKey == 'oneValue'
+    profile = str(tmp_path / 'app.profile')
+    cfg.save_profile(profile)
+    with pytest.raises(ValueError):
+        lazyConfig.from_path('tests/config_default').save_profile(profile)
+
+    cfg = lazyConfig.from_path('tests/config_default', ['tests/config'])
+    lazyConfig.prefetch(cfg, profile).join()
+    loaded = dict(cfg._config._loaded())
+    assert loaded.keys() == {'database', 'list'}, 'only the recorded keys should be loaded'
+    assert not loaded['database']._loaded(), 'database/configuration.yml was not accessed'
+    assert 1 in loaded['list']._cache and 0 not in loaded['list']._cache
+    assert cfg.database.connection.timeout == 42
+
+    cfg = lazyConfig.from_path('tests/config_default', prefetch_profile=profile)
+    for thread in threading.enumerate():
+        if thread.name == 'lazyConfig-prefetch':
+            thread.join()
+    assert dict(cfg._config._loaded()).keys() == {'database', 'list'}
+
+def test_child_override():
+    cfg = lazyConfig.from_path('tests/config_default', ['tests/config'])
+    database = cfg.database
+    database.add_override({'connection': {'timeout': 1}})
+    assert database.connection.timeout == 1 and cfg.database.connection.timeout == 1
+    cfg.add_override({'version': 5})
+    assert cfg.database.connection.timeout == 1, 'child override lost on invalidation'
+    assert cfg.as_dict()['database']['connection']['timeout'] == 1
+
+    for laziness in LazyMode:
+        cfg = lazyConfig.from_path('tests/config_default', ['tests/config'], laziness)
+        host = cfg.database.connection.hosts[0]
+        host.add_override({'port': 1})
+        assert host.port == 1 and cfg.database.connection.hosts[0].port == 1
+        cfg.add_override({'version': 3})
+        assert cfg.database.connection.hosts[0].port == 1, 'element override lost'
+        assert cfg.database.connection.hosts[-1].host == 'myElasticsearchServer'
+        assert cfg.as_dict()['database']['connection']['hosts'][0]['port'] == 1
+
+    cfg = lazyConfig.from_primitive({'matrix': [[{'a': 1}, {'a': 2}]], 'b': 0})
+    cfg.matrix[0][1].add_override({'a': 3})
+    cfg.add_override({'b': 1})
+    assert cfg.as_dict() == {'matrix': [[{'a': 1}, {'a': 3}]], 'b': 1}
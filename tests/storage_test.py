@@ -0,0 +1,37 @@
+import os, zipfile
+
+import lazyConfig
+from lazyConfig import LazyMode
+
+def _zip(directory, archive):
+    with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for root, _, files in os.walk(directory):
+            for name in files:
+                path = os.path.join(root, name)
+                zf.write(path, os.path.relpath(path, directory))
+    return str(archive)
+
+def test_from_archive(tmp_path):
+    default = _zip('tests/config_default', tmp_path / 'default.zip')
+    override = _zip('tests/config', tmp_path / 'override.zip')
+    expected = lazyConfig.from_path('tests/config_default', ['tests/config']).as_dict()
+
+    cfg = lazyConfig.from_archive(default, [override])
+    assert cfg.database.connection.hosts[0].host == 'myElasticsearchServer'
+    assert cfg._config._unloaded(), 'accessing one key loaded everything'
+    assert cfg.list[0] == 'haha'
+    for laziness in LazyMode:
+        assert lazyConfig.from_archive(default, [override], laziness).as_dict() == expected
+    # archives and directories can be mixed
+    assert lazyConfig.from_archive(default, ['tests/config']).as_dict() == expected
+    assert not lazyConfig.from_archive(default, [override]).refresh()
+
+def test_archive_layers_bounded(tmp_path):
+    for name, value in [('a', 1), ('b', 10)]:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / 'app.yml').write_text(f'x: {value}')
+    default = _zip(tmp_path / 'a', tmp_path / 'a.zip')
+    override = _zip(tmp_path / 'b', tmp_path / 'b.zip')
+    for laziness in LazyMode:
+        cfg = lazyConfig.from_archive(default, [override], laziness=laziness)
+        assert cfg.app.x == 10, laziness